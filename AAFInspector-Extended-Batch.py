@@ -13,129 +13,150 @@ from __future__ import (
 
 import sys
 import os
-import json
-import datetime
-import uuid
 import traceback
 import importlib
+import concurrent.futures
+import functools
+import multiprocessing
+import shutil
+import subprocess
+import time
 
 from PySide6 import QtCore, QtWidgets, QtGui
 
+from convert_cli import convert_file, COMPILED as CONVERTER_COMPILED
+
 # We will attempt to import aaf2 later, after the user provides the path.
 
-# Tracks to be excluded from the JSON export. Case-insensitive.
-EXCLUDED_TRACK_NAMES = {f'a{i}' for i in range(1, 9)} | {'data track'}
+# Interpreters tried, in order, for running convert_cli.py out of process.
+PYPY_EXECUTABLES = ('pypy3', 'pypy')
+CONVERT_CLI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "convert_cli.py")
+# Log lines from the worker are batched and sent to the GUI at most this often (seconds).
+PROGRESS_FLUSH_INTERVAL = 0.1
+# Number of lines kept in the log view during long batches.
+LOG_MAX_LINES = 5000
+# QSettings location used to remember the 'aaf2' library folder.
+SETTINGS_ORG = "aafinspector"
+SETTINGS_APP = "ext"
+
+
+def _convert_file_external(interpreter, aaf_path, output_dir, lib_path, output_format, compress, pretty):
+    """Runs convert_cli.py under another interpreter (e.g. PyPy) and returns its output."""
+    args = [interpreter, CONVERT_CLI_PATH, aaf_path, output_dir]
+    if lib_path:
+        args.append(lib_path)
+    args += ["--format", output_format]
+    if compress:
+        args.append("--gzip")
+    if pretty:
+        args.append("--pretty")
+    result = subprocess.run(args, capture_output=True, text=True)
+    output = result.stdout.strip()
+    if result.returncode != 0 and not output:
+        output = f"  -> ERROR converting {os.path.basename(aaf_path)}: {result.stderr.strip()}"
+    return output
+
 
 class Worker(QtCore.QObject):
     """
-    Worker object for running the conversion in a separate thread.
+    Worker object that dispatches the conversion to a process pool from a
+    separate thread, so that files are converted in parallel. If PyPy is
+    installed, each file is converted by convert_cli.py running under it
+    instead. One worker lives for the whole session; each batch is started
+    by a queued call to run().
     """
     progress = QtCore.Signal(str)
     finished = QtCore.Signal()
     error = QtCore.Signal(str)
 
-    def __init__(self, file_list, output_dir, aaf2_module, mob_module):
+    def __init__(self):
         super().__init__()
-        self.file_list = file_list
-        self.output_dir = output_dir
-        # Pass the imported modules to the worker
-        self.aaf2 = aaf2_module
-        self.mob = mob_module
+        self.is_running = False
+        self._log_buf = []
+        self._last_flush = 0.0
+
+    def _log(self, message):
+        self._log_buf.append(message)
 
-    def run(self):
+    def _flush_log(self, force=False):
+        """Sends buffered log lines to the GUI as a single progress signal."""
+        if self._log_buf and (force or time.monotonic() - self._last_flush >= PROGRESS_FLUSH_INTERVAL):
+            self.progress.emit("\n".join(self._log_buf))
+            self._log_buf.clear()
+            self._last_flush = time.monotonic()
+
+    @QtCore.Slot(list, str, object, str, bool, bool)
+    def run(self, file_list, output_dir, lib_path, output_format='json', compress=False, pretty=False):
         """Main processing loop for the worker."""
+        self.file_list = file_list
+        self.output_dir = output_dir
+        self.lib_path = lib_path
+        self.output_format = output_format
+        self.compress = compress
+        self.pretty = pretty
+        self.is_running = True
         try:
             total_files = len(self.file_list)
-            for i, aaf_path in enumerate(self.file_list):
-                if not self.is_running:
-                    self.progress.emit("Process cancelled.")
-                    break
-                self.progress.emit(f"Processing file {i+1} of {total_files}: {os.path.basename(aaf_path)}")
-                self._process_file(aaf_path)
+            max_workers = min(total_files, os.cpu_count() or 1, 61) or 1 # 61 is the Windows limit
+            pypy = next(filter(None, map(shutil.which, PYPY_EXECUTABLES)), None)
+            if pypy:
+                # Each task is its own PyPy process, so threads are enough to drive them.
+                executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+                task = functools.partial(_convert_file_external, pypy)
+                self._log(f"Converting {total_files} file(s) with {pypy} using {max_workers} process(es)...")
+            else:
+                executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+                task = convert_file
+                build = "compiled" if CONVERTER_COMPILED else "pure Python"
+                self._log(f"Converting {total_files} file(s) using {max_workers} process(es) ({build} converter)...")
+            self._flush_log(force=True)
+            with executor:
+                futures = {
+                    executor.submit(task, aaf_path, self.output_dir, self.lib_path,
+                                    self.output_format, self.compress, self.pretty): aaf_path
+                    for aaf_path in self.file_list
+                }
+                pending = set(futures)
+                done_count = 0
+                while pending:
+                    # Wake up at least once per flush interval so buffered lines never sit for long.
+                    done, pending = concurrent.futures.wait(
+                        pending, timeout=PROGRESS_FLUSH_INTERVAL,
+                        return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    if not self.is_running:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        self._log("Process cancelled.")
+                        break
+                    for future in done:
+                        done_count += 1
+                        aaf_path = futures[future]
+                        self._log(f"Finished file {done_count} of {total_files}: {os.path.basename(aaf_path)}")
+                        try:
+                            self._log(future.result())
+                        except Exception as e:
+                            self._log(f"  -> ERROR converting {os.path.basename(aaf_path)}: {e}")
+                    self._flush_log()
             if self.is_running:
-                self.progress.emit("\nBatch conversion complete.")
+                self._log("\nBatch conversion complete.")
         except Exception as e:
+            self._flush_log(force=True)
             detailed_error = f"An unexpected error occurred: {e}\n\n{traceback.format_exc()}"
             self.error.emit(detailed_error)
         finally:
+            self._flush_log(force=True)
+            self.is_running = False
             self.finished.emit()
 
     def stop(self):
         self.is_running = False
 
-    def _process_file(self, aaf_path):
-        """Opens, converts, and saves a single AAF file."""
-        base_name = os.path.splitext(os.path.basename(aaf_path))[0]
-        json_path = os.path.join(self.output_dir, f"{base_name}.json")
-
-        try:
-            with self.aaf2.open(aaf_path, 'r') as f:
-                content_node = self.build_node(f.header, "Header")
-                final_json = { "name": "Root", "class": "Root", "children": [content_node] }
-
-            with open(json_path, 'w', encoding='utf-8') as out_file:
-                json.dump(final_json, out_file, indent=4, ensure_ascii=False)
-            self.progress.emit(f"  -> Successfully saved to {os.path.basename(json_path)}")
-        except Exception as e:
-            self.progress.emit(f"  -> ERROR converting {os.path.basename(aaf_path)}: {e}\n{traceback.format_exc()}")
-
-    def build_node(self, item, name):
-        """
-        Recursive function to build a dictionary that matches the
-        name/class/children or name/class/value schema.
-        """
-        class_name = item.__class__.__name__
-        node = {"name": name, "class": class_name}
-
-        if isinstance(item, self.aaf2.core.AAFObject):
-            children = []
-            is_comp_mob = isinstance(item, self.mob.CompositionMob)
-            for prop in item.properties():
-                prop_name = prop.name
-                if is_comp_mob and prop_name == "Slots":
-                    for slot in prop.value:
-                        if getattr(slot, 'name', '').lower() not in EXCLUDED_TRACK_NAMES:
-                            children.append(self.build_node(slot, slot.name))
-                else:
-                    children.append(self.build_node(prop, prop_name))
-            if children:
-                node['children'] = children
-        elif isinstance(item, (self.aaf2.properties.StrongRefVectorProperty, self.aaf2.properties.StrongRefSetProperty)):
-            children = []
-            if item.value:
-                for child_item in item.value:
-                    child_name = getattr(child_item, 'name', child_item.__class__.__name__)
-                    children.append(self.build_node(child_item, child_name))
-            if children:
-                node['children'] = children
-        elif isinstance(item, self.aaf2.properties.StrongRefProperty):
-            child_item = item.value
-            if child_item:
-                child_name = getattr(child_item, 'name', child_item.__class__.__name__)
-                node['children'] = [self.build_node(child_item, child_name)]
-        elif isinstance(item, self.aaf2.properties.Property):
-            node['value'] = self._serialize_json_value(item.value)
-        else:
-            node['value'] = self._serialize_json_value(item)
-        return node
-
-    def _serialize_json_value(self, value):
-        """Converts a Python value into a JSON-serializable format."""
-        if isinstance(value, (str, int, float, bool, type(None))):
-            return value
-        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
-            return value.isoformat()
-        if isinstance(value, uuid.UUID):
-            return str(value)
-        if isinstance(value, bytes):
-            return repr(value)
-        if isinstance(value, dict):
-            return {str(k): self._serialize_json_value(v) for k, v in value.items()}
-        return str(value)
-
 
 class MainWindow(QtWidgets.QMainWindow):
     """The main application window."""
+    # Starts a batch on the worker thread: files, output dir, lib path, format, gzip, pretty.
+    batch_requested = QtCore.Signal(list, str, object, str, bool, bool)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("AAF to JSON Batch Converter")
@@ -144,11 +165,10 @@ class MainWindow(QtWidgets.QMainWindow):
         # Module placeholders
         self.aaf2_module = None
         self.mob_module = None
+        self.lib_path = None
         
         self.input_paths = []
         self.output_dir = ""
-        self.thread = None
-        self.worker = None
 
         main_widget = QtWidgets.QWidget()
         self.setCentralWidget(main_widget)
@@ -183,7 +203,17 @@ class MainWindow(QtWidgets.QMainWindow):
         self.output_label = QtWidgets.QLabel("No output directory set.")
         self.output_label.setWordWrap(True)
         self.select_output_btn = QtWidgets.QPushButton("Set Directory...")
+        self.format_combo = QtWidgets.QComboBox()
+        self.format_combo.addItem("JSON", "json")
+        self.format_combo.addItem("MessagePack", "msgpack")
+        self.format_combo.addItem("BSON", "bson")
+        self.compress_check = QtWidgets.QCheckBox("Compress output (.gz)")
+        self.pretty_check = QtWidgets.QCheckBox("Pretty-print JSON")
         output_layout.addWidget(self.output_label)
+        output_layout.addWidget(QtWidgets.QLabel("Output format:"))
+        output_layout.addWidget(self.format_combo)
+        output_layout.addWidget(self.compress_check)
+        output_layout.addWidget(self.pretty_check)
         output_layout.addWidget(self.select_output_btn)
         self.layout.addWidget(self.output_group)
 
@@ -196,9 +226,10 @@ class MainWindow(QtWidgets.QMainWindow):
 
         log_group = QtWidgets.QGroupBox("Log")
         log_layout = QtWidgets.QVBoxLayout(log_group)
-        self.log_widget = QtWidgets.QTextEdit()
+        self.log_widget = QtWidgets.QPlainTextEdit()
         self.log_widget.setReadOnly(True)
-        log_layout.addWidget(log_group)
+        self.log_widget.setMaximumBlockCount(LOG_MAX_LINES) # Older lines are trimmed automatically
+        log_layout.addWidget(self.log_widget)
         self.layout.addWidget(log_group)
 
         # --- Connections ---
@@ -207,8 +238,25 @@ class MainWindow(QtWidgets.QMainWindow):
         self.select_folder_btn.clicked.connect(self.select_folder)
         self.select_output_btn.clicked.connect(self.select_output)
         self.start_btn.clicked.connect(self.start_conversion)
+        self.format_combo.currentIndexChanged.connect(self.update_pretty_check_state)
         
+        # --- Worker thread, started once and reused for every batch ---
+        self.thread = QtCore.QThread(self)
+        self.worker = Worker()
+        self.worker.moveToThread(self.thread)
+        self.thread.finished.connect(self.worker.deleteLater)
+        self.batch_requested.connect(self.worker.run)
+        self.worker.progress.connect(self.log)
+        self.worker.error.connect(self.show_error_message)
+        self.worker.finished.connect(self.batch_finished) # Queued back to the GUI thread
+        self.thread.start()
+
         self.toggle_main_ui(False) # Start with main UI disabled
+
+        # Reuse the library located on a previous launch, if it is still there
+        saved_lib_path = QtCore.QSettings(SETTINGS_ORG, SETTINGS_APP).value("lib_path")
+        if saved_lib_path and os.path.isdir(saved_lib_path):
+            self.load_library(saved_lib_path, quiet=True)
         self.update_start_button_state()
 
     def locate_library(self):
@@ -218,24 +266,36 @@ class MainWindow(QtWidgets.QMainWindow):
         )
         if not path:
             return
+        self.load_library(path)
 
+    def load_library(self, path, quiet=False):
+        """
+        Imports 'aaf2' from `path` and enables the main UI. The path is saved
+        so that it is loaded again on the next launch. Returns True on success;
+        on failure an error is shown unless `quiet` is set.
+        """
         sys.path.insert(0, path)
         try:
             # Dynamically import the library
             self.aaf2_module = importlib.import_module("aaf2")
             self.mob_module = importlib.import_module("aaf2.mob")
+            self.lib_path = path
+            QtCore.QSettings(SETTINGS_ORG, SETTINGS_APP).setValue("lib_path", path)
             
             self.lib_label.setText(f"Library found at: {path}")
             self.lib_label.setStyleSheet("color: green;")
             self.locate_lib_btn.setEnabled(False)
             self.toggle_main_ui(True) # Enable the rest of the UI
+            return True
         except ImportError:
-            QtWidgets.QMessageBox.critical(
-                self, "Library Not Found",
-                f"The 'aaf2' library was not found in the selected directory:\n\n{path}\n\nPlease select the correct parent folder."
-            )
+            if not quiet:
+                QtWidgets.QMessageBox.critical(
+                    self, "Library Not Found",
+                    f"The 'aaf2' library was not found in the selected directory:\n\n{path}\n\nPlease select the correct parent folder."
+                )
             # Remove the bad path to avoid issues
             sys.path.pop(0)
+            return False
 
     def toggle_main_ui(self, enabled):
         """Enables or disables the main application controls."""
@@ -254,7 +314,8 @@ class MainWindow(QtWidgets.QMainWindow):
     def select_folder(self):
         folder_path = QtWidgets.QFileDialog.getExistingDirectory(self, "Select Folder Containing AAFs")
         if folder_path:
-            self.input_paths = [os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.lower().endswith(".aaf")]
+            with os.scandir(folder_path) as entries:
+                self.input_paths = [e.path for e in entries if e.name.lower().endswith(".aaf") and e.is_file()]
             self.input_label.setText(f"Selected Folder: {folder_path} ({len(self.input_paths)} AAFs found)")
             self.log_widget.clear()
             if not self.input_paths:
@@ -268,12 +329,16 @@ class MainWindow(QtWidgets.QMainWindow):
             self.output_label.setText(f"Output Directory: {dir_path}")
         self.update_start_button_state()
 
+    def update_pretty_check_state(self):
+        # Pretty-printing only applies to JSON output
+        self.pretty_check.setEnabled(self.format_combo.currentData() == "json")
+
     def update_start_button_state(self):
         enabled = bool(self.input_paths and self.output_dir and self.aaf2_module)
         self.start_btn.setEnabled(enabled)
 
     def log(self, message):
-        self.log_widget.append(message)
+        self.log_widget.appendPlainText(message)
 
     def show_error_message(self, message):
         QtWidgets.QMessageBox.critical(self, "Error", message)
@@ -282,17 +347,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.log_widget.clear()
         self.log("Starting batch conversion...")
         self.set_ui_enabled(False)
-        self.thread = QtCore.QThread()
-        self.worker = Worker(self.input_paths, self.output_dir, self.aaf2_module, self.mob_module)
-        self.worker.moveToThread(self.thread)
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.worker.progress.connect(self.log)
-        self.worker.error.connect(self.show_error_message)
-        self.thread.finished.connect(lambda: self.set_ui_enabled(True))
-        self.thread.start()
+        self.batch_requested.emit(list(self.input_paths), self.output_dir, self.lib_path,
+                                  self.format_combo.currentData(), self.compress_check.isChecked(),
+                                  self.pretty_check.isChecked())
+
+    def batch_finished(self):
+        self.set_ui_enabled(True)
 
     def set_ui_enabled(self, enabled):
         # We only re-enable the parts that should be active after the lib is found
@@ -308,14 +368,15 @@ class MainWindow(QtWidgets.QMainWindow):
             self.start_btn.setText("Processing...")
 
     def closeEvent(self, event):
-        if self.thread and self.thread.isRunning():
+        if self.worker.is_running:
             self.log("Stopping process...")
             self.worker.stop()
-            self.thread.quit()
-            self.thread.wait()
+        self.thread.quit()
+        self.thread.wait()
         event.accept()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     app = QtWidgets.QApplication(sys.argv)
     window = MainWindow()
     window.show()
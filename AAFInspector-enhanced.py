@@ -6,9 +6,11 @@ from __future__ import (
 )
 import sys
 import os
-import json
 import datetime
 import uuid
+import collections
+import operator
+import heapq
 
 from PySide6 import QtCore
 from PySide6 import QtWidgets
@@ -21,6 +23,56 @@ except ImportError:
     print("Please ensure the local 'aaf2' folder is in the same directory as this script.")
     sys.exit(1)
 
+# Encodes exported values indented by four spaces, with orjson when it is
+# installed (re-indented to match json's output) and json otherwise
+from aaf_export import export_json
+
+# Exported values of these exact types are written as they are; the ones in
+# _JSON_CONV need one call. Anything else goes through the isinstance chain
+# in Window._serialize_json_value.
+_JSON_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+_JSON_CONV = {
+    datetime.datetime: datetime.datetime.isoformat,
+    datetime.date: datetime.date.isoformat,
+    datetime.time: datetime.time.isoformat,
+    uuid.UUID: str,
+    bytes: repr,
+}
+
+# Number of loaded TreeItems kept before collapsed branches are unloaded again.
+# None keeps everything that has been loaded.
+TREE_CACHE_LIMIT = 50000
+
+# Members of a StrongRefSet are sorted by key. Only this many are ordered
+# up front; the full sort waits until a row past them is asked for.
+REF_SORT_WINDOW = 32
+
+# Display options, in the order their root items are listed, and how each
+# one's items are read from an open AAF file.
+_ROOT_OPTION_ORDER = (
+    ('toplevel', lambda f: list(f.content.toplevel())),
+    ('compmobs', lambda f: list(f.content.compositionmobs())),
+    ('mastermobs', lambda f: list(f.content.mastermobs())),
+    ('sourcemobs', lambda f: list(f.content.sourcemobs())),
+    ('dictionary', lambda f: f.dictionary),
+    ('metadict', lambda f: f.metadict),
+    ('root', lambda f: f.root),
+)
+
+# Expand All asks for confirmation when there are more top-level rows than this.
+EXPAND_ALL_WARN_ROWS = 500
+
+# Objects whose properties are listed in the order aaf2 reports them rather
+# than sorted by name.
+_UNSORTED_PROPERTY_OWNERS = (aaf2.dictionary.Dictionary, aaf2.metadict.MetaDictionary)
+
+# Milliseconds to wait for a burst of change notifications on the open file
+# (e.g. an editor truncating and then writing it) to end before asking to reload.
+FILE_CHANGE_DEBOUNCE_MS = 250
+
+# Longest repr() kept for the Name/Class tooltip.
+TOOLTIP_REPR_LIMIT = 512
+
 
 class InputDialog(QtWidgets.QDialog):
     def __init__(self, default_options, parent=None):
@@ -108,42 +160,58 @@ class InputDialog(QtWidgets.QDialog):
         return self.filePath, self.options
 
 class TreeItem(object):
+    __slots__ = ('parentItem', 'item', 'children', 'children_count', 'properties', '_search_blob',
+                 'loaded', 'fetched', 'index', 'references', '_refs_raw', 'model')
+
     def __init__(self, item, parent=None, index=0):
         self.parentItem = parent
         self.item = item
-        self.children = {}
+        self.children = []
         self.children_count = 0
         self.properties = {}
+        self._search_blob = ''
         self.loaded = False
+        self.fetched = False # Whether the model has shown the children to the view
         self.index = index
         self.references = []
+        self._refs_raw = None # Unsorted set keys, until references holds all of them
+        self.model = parent.model if parent is not None else None
 
     def columnCount(self):
         return 1
 
     def childCount(self):
-        self.setup()
+        if not self.loaded:
+            self.setup()
         return self.children_count
 
+    def hasChildren(self):
+        """
+        Whether the item has (or may have) children, answered from its type
+        where possible so the view's expand arrows don't load every row.
+        Returns None when only setup() can tell.
+        """
+        if self.loaded:
+            return self.children_count > 0
+        handler = self._handler(self._SETUP_HANDLERS, self._resolve_setup_handler, self.item)
+        if handler is TreeItem._setup_property:
+            return False
+        if handler is TreeItem._setup_nothing:
+            return None
+        return True
+
     def child(self, row):
-        self.setup()
-        if row in self.children:
-            return self.children[row]
-
-        if isinstance(self.item, aaf2.properties.StrongRefSetProperty):
-            if row < len(self.references):
-                key = self.references[row]
-                item = self.item.get(key)
-                t = TreeItem(item, self, row)
-            else: return None
-        elif isinstance(self.item, aaf2.properties.StrongRefVectorProperty):
-            if 0 <= row < len(self.item):
-                item = self.item.get(row)
-                t = TreeItem(item, self, row)
-            else: return None
-        else:
+        if not self.loaded:
+            self.setup()
+        if not 0 <= row < len(self.children):
             return None
-        self.children[row] = t
+        t = self.children[row]
+        if t is None:
+            # Members of sets and vectors are only wrapped when first asked for
+            get_child = self._handler(self._CHILD_GETTERS, self._resolve_child_getter, self.item)
+            if get_child is None:
+                return None
+            t = self.children[row] = TreeItem(get_child(self, row), self, row)
         return t
 
     def childNumber(self):
@@ -153,11 +221,9 @@ class TreeItem(object):
         return self.parentItem
 
     def extend(self, items):
-        for i in items:
-            index = self.children_count
-            t = TreeItem(i, self, index)
-            self.children[index] = t
-            self.children_count += 1
+        base = len(self.children)
+        self.children.extend([TreeItem(i, self, base + k) for k, i in enumerate(items)])
+        self.children_count = len(self.children)
 
     def name(self):
         item = self.item
@@ -182,62 +248,22 @@ class TreeItem(object):
             return item.class_name
         return getattr(item, '__class__', type(None)).__name__
 
+    def tooltip_repr(self):
+        """repr() of the wrapped item, cut to TOOLTIP_REPR_LIMIT and built on first hover only."""
+        tooltip = self.properties.get('_tooltip')
+        if tooltip is None:
+            try:
+                tooltip = repr(self.item)[:TOOLTIP_REPR_LIMIT]
+            except Exception:
+                tooltip = self.properties.get('Name', '')
+            self.properties['_tooltip'] = tooltip
+        return tooltip
+
     def setup(self):
         if self.loaded:
             return
         item = self.item
-        if isinstance(item, DummyItem):
-             self.extend([item.item])
-             self.properties['Name'] = self.name()
-             self.properties['Class'] = self.class_name()
-             self.loaded = True
-             return
-        if isinstance(item, list):
-            self.extend(item)
-        if isinstance(item, aaf2.core.AAFObject):
-            try:
-                props = sorted(list(item.properties()), key=lambda p: getattr(p, 'name', ''))
-                self.extend(props)
-            except Exception as e:
-                 print(f"Error accessing properties for {self.name()}: {e}")
-        elif isinstance(item, aaf2.properties.StrongRefProperty):
-            if item.value:
-                self.extend([item.value])
-        elif isinstance(item, aaf2.properties.StrongRefVectorProperty):
-             try:
-                 self.children_count = len(item)
-             except Exception as e:
-                  print(f"Error getting length of StrongRefVectorProperty {self.name()}: {e}")
-                  self.children_count = 0
-        elif isinstance(item, aaf2.properties.StrongRefSetProperty):
-            try:
-                self.children_count = len(item)
-                try:
-                    keys = list(item.references.keys())
-                    try:
-                        self.references = sorted(keys)
-                    except TypeError:
-                        self.references = keys
-                except Exception as e:
-                    print(f"Error processing references for {self.name()}: {e}")
-                    self.references = []
-                    self.children_count = 0
-            except Exception as e:
-                  print(f"Error getting length/references of StrongRefSetProperty {self.name()}: {e}")
-                  self.children_count = 0
-                  self.references = []
-        elif isinstance(item, (aaf2.properties.Property)):
-            try:
-                v_raw = item.value
-                if isinstance(v_raw, (str, bytes)) and len(v_raw) > 100:
-                    v = repr(v_raw[:100]) + "... (truncated)"
-                elif isinstance(v_raw, (dict, list, tuple)) and len(str(v_raw)) > 100:
-                     v = str(type(v_raw)) + " ... (truncated)"
-                else:
-                     v = str(v_raw)
-            except Exception as e:
-                v = f"<Error accessing value: {type(e).__name__}>"
-            self.properties['Value'] = v
+        self._handler(self._SETUP_HANDLERS, self._resolve_setup_handler, item)(self, item)
         if hasattr(item, 'mob') and hasattr(item, 'slot'):
              try:
                  mob = item.mob
@@ -254,9 +280,166 @@ class TreeItem(object):
 
         self.properties['Name'] = self.name()
         self.properties['Class'] = self.class_name()
+        # Lowercased Name/Value/Class for search; \0 keeps a match from spanning two columns
+        self._search_blob = f"{self.properties['Name']}\0{self.properties.get('Value', '')}\0{self.properties['Class']}".lower()
         self.loaded = True
+        if self.model is not None:
+            self.model.touch(self)
+
+    def unload(self):
+        """Drops the loaded children and properties; setup() rebuilds them on demand."""
+        self.children = []
+        self.children_count = 0
+        self.properties = {}
+        self._search_blob = ''
+        self.references = []
+        self._refs_raw = None
+        self.loaded = False
+        self.fetched = False
+
+    # --- Per-type setup() and child() handlers ---
+    # Handlers are looked up by the exact type of the wrapped item. A type
+    # that isn't in a table yet is resolved once with isinstance and added.
+
+    @staticmethod
+    def _handler(table, resolve, item):
+        item_type = type(item)
+        try:
+            return table[item_type]
+        except KeyError:
+            handler = table[item_type] = resolve(item)
+            return handler
+
+    @staticmethod
+    def _resolve_setup_handler(item):
+        if isinstance(item, DummyItem):
+            return TreeItem._setup_dummy
+        if isinstance(item, list):
+            return TreeItem._setup_list
+        if isinstance(item, _UNSORTED_PROPERTY_OWNERS):
+            return TreeItem._setup_object_unsorted
+        if isinstance(item, aaf2.core.AAFObject):
+            return TreeItem._setup_object
+        if isinstance(item, aaf2.properties.StrongRefProperty):
+            return TreeItem._setup_strongref
+        if isinstance(item, aaf2.properties.StrongRefVectorProperty):
+            return TreeItem._setup_vector
+        if isinstance(item, aaf2.properties.StrongRefSetProperty):
+            return TreeItem._setup_set
+        if isinstance(item, aaf2.properties.Property):
+            return TreeItem._setup_property
+        return TreeItem._setup_nothing
+
+    @staticmethod
+    def _resolve_child_getter(item):
+        if isinstance(item, aaf2.properties.StrongRefSetProperty):
+            return TreeItem._set_member
+        if isinstance(item, aaf2.properties.StrongRefVectorProperty):
+            return TreeItem._vector_member
+        return None
+
+    def _setup_dummy(self, item):
+        self.extend([item.item])
+
+    def _setup_list(self, item):
+        self.extend(item)
+
+    def _setup_object(self, item):
+        try:
+            props = list(item.properties())
+            try:
+                props.sort(key=operator.attrgetter('name'))
+            except AttributeError:
+                props.sort(key=lambda p: getattr(p, 'name', ''))
+            self.extend(props)
+        except Exception as e:
+             print(f"Error accessing properties for {self.name()}: {e}")
+
+    def _setup_object_unsorted(self, item):
+        try:
+            self.extend(list(item.properties()))
+        except Exception as e:
+             print(f"Error accessing properties for {self.name()}: {e}")
+
+    def _setup_strongref(self, item):
+        if item.value:
+            self.extend([item.value])
+
+    def _setup_vector(self, item):
+         try:
+             self.children_count = len(item)
+         except Exception as e:
+              print(f"Error getting length of StrongRefVectorProperty {self.name()}: {e}")
+              self.children_count = 0
+         self.children = [None] * self.children_count
+
+    def _setup_set(self, item):
+        try:
+            self.children_count = len(item)
+            try:
+                keys = list(item.references.keys())
+                try:
+                    self.references = heapq.nsmallest(REF_SORT_WINDOW, keys)
+                    if len(keys) > REF_SORT_WINDOW:
+                        self._refs_raw = keys
+                except TypeError:
+                    self.references = keys
+            except Exception as e:
+                print(f"Error processing references for {self.name()}: {e}")
+                self.references = []
+                self.children_count = 0
+        except Exception as e:
+              print(f"Error getting length/references of StrongRefSetProperty {self.name()}: {e}")
+              self.children_count = 0
+              self.references = []
+        self.children = [None] * self.children_count
+
+    def _setup_property(self, item):
+        try:
+            v_raw = item.value
+            if isinstance(v_raw, (str, bytes)) and len(v_raw) > 100:
+                v = repr(v_raw[:100]) + "... (truncated)"
+            elif isinstance(v_raw, (dict, list, tuple)) and len(str(v_raw)) > 100:
+                 v = str(type(v_raw)) + " ... (truncated)"
+            else:
+                 v = str(v_raw)
+        except Exception as e:
+            v = f"<Error accessing value: {type(e).__name__}>"
+        self.properties['Value'] = v
+
+    def _setup_nothing(self, item):
+        pass
+
+    def _set_member(self, row):
+        if row >= len(self.references) and self._refs_raw is not None:
+            # The first rows were taken from the smallest keys; now sort them all
+            try:
+                self.references = sorted(self._refs_raw)
+            except TypeError:
+                # Keep the rows already shown where they are; the rest follow in key order
+                shown = set(self.references)
+                self.references = self.references + [key for key in self._refs_raw if key not in shown]
+            self._refs_raw = None
+        return self.item.get(self.references[row])
+
+    def _vector_member(self, row):
+        return self.item.get(row)
+
+    _SETUP_HANDLERS = {
+        list: _setup_list,
+        aaf2.properties.StrongRefProperty: _setup_strongref,
+        aaf2.properties.StrongRefVectorProperty: _setup_vector,
+        aaf2.properties.StrongRefSetProperty: _setup_set,
+        aaf2.properties.Property: _setup_property,
+    }
+    _CHILD_GETTERS = {
+        aaf2.properties.StrongRefVectorProperty: _vector_member,
+        aaf2.properties.StrongRefSetProperty: _set_member,
+    }
 
 class DummyItem:
+     __slots__ = ('_name', 'item')
+
      def __init__(self, name, target_item):
          self._name = name
          self.item = target_item
@@ -275,10 +458,60 @@ class DummyItem:
          return [self.item]
 
 class AAFModel(QtCore.QAbstractItemModel):
-    def __init__(self, root, parent=None):
+    def __init__(self, root, parent=None, cache_limit=TREE_CACHE_LIMIT):
         super(AAFModel, self).__init__(parent)
-        self.rootItem = TreeItem(root, parent=None, index=0)
         self.headers = ['Name', 'Value', 'Class']
+        # Loaded TreeItems, least recently loaded first.
+        self._lru = collections.OrderedDict()
+        self._evict_pending = False
+        self.cache_limit = cache_limit
+        # Set by the view; only items it reports as collapsed are unloaded.
+        self.can_evict = lambda tree_item: True
+        self.rootItem = TreeItem(root, parent=None, index=0)
+        self.rootItem.model = self
+        self.rootItem.fetched = True
+
+    def touch(self, tree_item):
+        """Records that tree_item was loaded, scheduling an eviction pass if over the limit."""
+        self._lru[id(tree_item)] = tree_item
+        self._lru.move_to_end(id(tree_item))
+        self.scheduleEviction()
+
+    def scheduleEviction(self):
+        """Unloads collapsed branches from the event loop once over the cache limit."""
+        if self.cache_limit and len(self._lru) > self.cache_limit and not self._evict_pending:
+            # Rows can't be removed while the view is in the middle of a data() call.
+            self._evict_pending = True
+            QtCore.QTimer.singleShot(0, self._evict)
+
+    def _evict(self):
+        self._evict_pending = False
+        for key, tree_item in list(self._lru.items()):
+            if len(self._lru) <= self.cache_limit:
+                break
+            if key not in self._lru or tree_item is self.rootItem:
+                continue # Already dropped along with an evicted ancestor
+            # Only branches with loaded children free anything; unloading
+            # leaves that are on screen would just reload them on the next paint.
+            if not any(child is not None and child.loaded for child in tree_item.children):
+                continue
+            if not self.can_evict(tree_item):
+                continue
+            self._unload(tree_item)
+
+    def _unload(self, tree_item):
+        count = tree_item.children_count if tree_item.fetched else 0
+        if count:
+            self.beginRemoveRows(self.indexForItem(tree_item), 0, count - 1)
+        stack = [child for child in tree_item.children if child is not None]
+        while stack:
+            child = stack.pop()
+            self._lru.pop(id(child), None)
+            stack.extend(c for c in child.children if c is not None)
+        self._lru.pop(id(tree_item), None)
+        tree_item.unload()
+        if count:
+            self.endRemoveRows()
 
     def headerData(self, section, orientation, role):
         if orientation == QtCore.Qt.Orientation.Horizontal and role == QtCore.Qt.ItemDataRole.DisplayRole:
@@ -292,9 +525,56 @@ class AAFModel(QtCore.QAbstractItemModel):
     def columnCount(self, parent=QtCore.QModelIndex()):
         return len(self.headers)
 
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        parentItem = self.getItem(parent)
+        if parentItem is None:
+            return False
+        has_children = parentItem.hasChildren()
+        if has_children is None:
+            return parentItem.childCount() > 0
+        return has_children
+
+    # Children are handed to the view through canFetchMore()/fetchMore();
+    # until then rowCount() reports none, so asking for it loads nothing.
+
     def rowCount(self, parent=QtCore.QModelIndex()):
         parentItem = self.getItem(parent)
-        return parentItem.childCount() if parentItem else 0
+        if parentItem is None or not parentItem.fetched:
+            return 0
+        return parentItem.childCount()
+
+    def canFetchMore(self, parent):
+        parentItem = self.getItem(parent)
+        return parentItem is not None and not parentItem.fetched and parentItem.hasChildren() is not False
+
+    def fetchMore(self, parent):
+        parentItem = self.getItem(parent)
+        if parentItem is not None and not parentItem.fetched:
+            self._fetch(parentItem, parent)
+
+    def fetchAll(self):
+        """
+        Loads and shows every item at once, with a single model reset instead
+        of a fetchMore() per branch. QTreeView.expandRecursively() only
+        expands rows the model has already handed over.
+        """
+        self.beginResetModel()
+        try:
+            stack = [self.rootItem]
+            while stack:
+                tree_item = stack.pop()
+                tree_item.fetched = True
+                stack.extend(filter(None, map(tree_item.child, range(tree_item.childCount()))))
+        finally:
+            self.endResetModel()
+
+    def _fetch(self, tree_item, index):
+        count = tree_item.childCount()
+        if count:
+            self.beginInsertRows(index, 0, count - 1)
+        tree_item.fetched = True
+        if count:
+            self.endInsertRows()
 
     def data(self, index, role):
         if not index.isValid():
@@ -303,17 +583,15 @@ class AAFModel(QtCore.QAbstractItemModel):
         if not item:
              return None
         if role in (QtCore.Qt.ItemDataRole.DisplayRole, QtCore.Qt.ItemDataRole.ToolTipRole):
-            item.setup()
+            if not item.loaded:
+                item.setup()
         if role == QtCore.Qt.ItemDataRole.DisplayRole:
             header_key = self.headers[index.column()]
             return str(item.properties.get(header_key, ''))
         elif role == QtCore.Qt.ItemDataRole.ToolTipRole:
              header_key = self.headers[index.column()]
              if header_key in ('Name', 'Class'):
-                  try:
-                       return repr(item.item)
-                  except Exception:
-                       return item.name()
+                  return item.tooltip_repr()
              elif header_key == 'Value':
                   raw_value_str = item.properties.get('Value', '')
                   if raw_value_str.endswith("... (truncated)"):
@@ -355,6 +633,33 @@ class AAFModel(QtCore.QAbstractItemModel):
                 return item
         return self.rootItem
 
+    def indexForItem(self, tree_item):
+        """Returns the column 0 index of a TreeItem that belongs to this model."""
+        if tree_item is None or tree_item is self.rootItem:
+            return QtCore.QModelIndex()
+        return self.createIndex(tree_item.childNumber(), 0, tree_item)
+
+    def indexForPath(self, path):
+        """Returns the column 0 index of the item reached by following a tuple of rows from the root."""
+        chain = self.indexChainForPath(path)
+        return chain[-1] if chain else QtCore.QModelIndex()
+
+    def indexChainForPath(self, path):
+        """
+        Returns the column 0 indexes of every item along a tuple of rows,
+        top-level row first, or an empty list if the path no longer exists.
+        """
+        chain = []
+        tree_item = self.rootItem
+        for row in path:
+            if not tree_item.fetched:
+                self._fetch(tree_item, chain[-1] if chain else QtCore.QModelIndex())
+            tree_item = tree_item.child(row)
+            if tree_item is None:
+                return []
+            chain.append(self.createIndex(row, 0, tree_item))
+        return chain
+
 class SearchDialog(QtWidgets.QDialog):
     def __init__(self, parent_window):
         super().__init__(parent_window)
@@ -396,7 +701,43 @@ class SearchDialog(QtWidgets.QDialog):
         event.ignore()
 
 
+class AafLoader(QtCore.QObject):
+    """
+    Opens an AAF file and gathers the root items for the selected display
+    options on a worker thread, so the window stays responsive while large
+    files are read. Results are handed back with the id of the request.
+    """
+    loaded = QtCore.Signal(int, object, object, object) # request id, aaf file, root items, [(option, error)]
+    error = QtCore.Signal(int, str)
+
+    @QtCore.Slot(int, str, object, object)
+    def run(self, request_id, file_path, options, aaf_file):
+        try:
+            f = aaf_file if aaf_file else aaf2.open(file_path, 'r')
+        except Exception as e:
+            self.error.emit(request_id, str(e))
+            return
+        root_items = []
+        option_errors = []
+        for key, get_data in _ROOT_OPTION_ORDER:
+            if options.get(key):
+                 try:
+                      print(f"Adding data from option: {key}")
+                      data = get_data(f)
+                      if isinstance(data, list):
+                          root_items.extend(data)
+                      else:
+                          root_items.append(data)
+                 except Exception as e:
+                      print(f"Error getting root data for option {key}: {e}")
+                      option_errors.append((key, e))
+        self.loaded.emit(request_id, f, root_items, option_errors)
+
+
 class Window(QtWidgets.QTreeView):
+    # Asks the loader thread for a file: request id, path, options, already open aaf file or None
+    loadRequested = QtCore.Signal(int, str, object, object)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.resize(800, 700)
@@ -406,16 +747,38 @@ class Window(QtWidgets.QTreeView):
         self.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
         self.setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.showContextMenu)
+        # Collapsed branches become candidates for unloading by the model
+        self.collapsed.connect(lambda index: self.model() and self.model().scheduleEviction())
         
         self.current_file_path = None
         self.current_options = {}
         self.aaf_file = None
         self.fs_watcher = None
+        self._changed_path = None
+        self._reload_timer = QtCore.QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.timeout.connect(self._prompt_reload)
         
         self.search_dialog = None
         self.search_results = []
         self.current_search_index = -1
         self.last_search_term = ""
+        self._search_index = None
+
+        # Files are opened on a worker thread that lives as long as the window
+        self._load_id = 0
+        # The aaf file (or None) handed to each request the loader hasn't answered yet,
+        # and files no longer shown that a pending request may still be reading
+        self._loads_pending = {}
+        self._retired_files = []
+        self._loader_thread = QtCore.QThread(self)
+        self._loader = AafLoader()
+        self._loader.moveToThread(self._loader_thread)
+        self._loader_thread.finished.connect(self._loader.deleteLater)
+        self.loadRequested.connect(self._loader.run)
+        self._loader.loaded.connect(self._onAafLoaded)
+        self._loader.error.connect(self._onAafLoadFailed)
+        self._loader_thread.start()
 
     @QtCore.Slot(QtCore.QPoint)
     def showContextMenu(self, point):
@@ -482,38 +845,54 @@ class Window(QtWidgets.QTreeView):
 
     def _perform_search(self, search_term):
         print(f"Performing new search for: '{search_term}'")
-        self.last_search_term = search_term
+        term = search_term.lower()
+        self.last_search_term = term
         self.search_results.clear()
         self.current_search_index = -1
         model = self.model()
         if not model:
             return
-        self._search_recursive(QtCore.QModelIndex(), search_term.lower())
+        if self._search_index is None:
+            self._search_index = self._build_search_index(model.rootItem)
+        self.search_results = [path for path, text in self._search_index if term in text]
         if not self.search_results:
             QtWidgets.QMessageBox.information(self, "Search", f"Term '{search_term}' not found.")
         else:
             print(f"Found {len(self.search_results)} match(es).")
 
-    def _search_recursive(self, parent_index, search_term):
-        model = self.model()
-        for r in range(model.rowCount(parent_index)):
-            for c in range(model.columnCount(parent_index)):
-                index = model.index(r, c, parent_index)
-                text = str(model.data(index, QtCore.Qt.ItemDataRole.DisplayRole)).lower()
-                if search_term in text:
-                    self.search_results.append(model.index(r, 0, parent_index))
-                    break
-            index = model.index(r, 0, parent_index)
-            if model.hasChildren(index):
-                self._search_recursive(index, search_term)
+    def _build_search_index(self, root_item):
+        """
+        Walks every TreeItem once, in display order, and returns a list of
+        (row path, TreeItem._search_blob) that later searches scan.
+        Rows are stored rather than items, since collapsed branches may be
+        unloaded by the model after the index is built.
+        """
+        search_index = []
+        append = search_index.append
+        stack = [(root_item, ())]
+        while stack:
+            tree_item, path = stack.pop()
+            if not tree_item.loaded:
+                tree_item.setup()
+            if path:
+                append((path, tree_item._search_blob))
+            children = tree_item.children
+            for r in range(len(children) - 1, -1, -1):
+                # Set and vector members that haven't been wrapped yet are created by child()
+                child = children[r] or tree_item.child(r)
+                if child is not None:
+                    stack.append((child, path + (r,)))
+        return search_index
 
     def _navigate_results(self):
         if not self.search_results: return
-        index = self.search_results[self.current_search_index]
-        parent = index.parent()
-        while parent.isValid():
-            self.expand(parent)
-            parent = parent.parent()
+        chain = self.model().indexChainForPath(self.search_results[self.current_search_index])
+        if not chain: return
+        # The ancestors come with the path, so no parent() walk is needed to expand them
+        for parent in chain[:-1]:
+            if not self.isExpanded(parent):
+                self.expand(parent)
+        index = chain[-1]
         self.scrollTo(index, QtWidgets.QAbstractItemView.ScrollHint.PositionAtCenter)
         self.setCurrentIndex(index)
 
@@ -551,37 +930,71 @@ class Window(QtWidgets.QTreeView):
         )
         if not filePath: return
         try:
-            print("Starting JSON export...")
-            json_data = self._convert_node_to_dict(model.rootItem)
             print(f"Writing JSON data to: {filePath}")
-            with open(filePath, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, indent=4, ensure_ascii=False)
+            with open(filePath, 'wb') as f:
+                self._stream_export(f, model.rootItem)
             QtWidgets.QMessageBox.information(self, "Export Successful", f"Data successfully exported to:\n{filePath}")
             print("JSON export finished successfully.")
         except Exception as e:
             print(f"Error during JSON export: {e}")
+            if os.path.exists(filePath):
+                try: os.remove(filePath)
+                except OSError: pass
             QtWidgets.QMessageBox.critical(self, "Export Failed", f"An error occurred while exporting to JSON.\n\nError: {e}")
 
-    def _convert_node_to_dict(self, tree_item):
-        tree_item.setup()
-        name = tree_item.name()
-        class_name = tree_item.class_name()
-        data = {"name": name, "class": class_name}
-        if "Value" in tree_item.properties:
-            raw_value = (tree_item.item.value if isinstance(tree_item.item, aaf2.properties.Property)
-                         else tree_item.properties.get("Value"))
-            data["value"] = self._serialize_json_value(raw_value)
-        children = []
-        for i in range(tree_item.childCount()):
-            child = tree_item.child(i)
-            if not child: continue
-            child_dict = self._convert_node_to_dict(child)
-            if child_dict: children.append(child_dict)
-        if children:
-            data["children"] = children
-        return data
+    def _stream_export(self, f, root_item):
+        """
+        Writes root_item and everything below it to the binary file `f` as
+        indented JSON, without building the whole tree as dicts first. An
+        explicit stack of open "children" lists replaces recursion, so deep
+        files don't run into the recursion limit.
+        """
+        write = f.write
+        indent = b'    ' # The same with or without orjson
+        def dumps(value, pad):
+            return export_json(value).encode('utf-8').replace(b'\n', b'\n' + pad)
+
+        stack = [] # (remaining children iterator, depth of the owning node)
+        tree_item, depth = root_item, 0
+        while True:
+            tree_item.setup()
+            props = tree_item.properties
+            pad = indent * (depth + 1)
+            write(b'{\n' + pad + b'"name": ' + dumps(props['Name'], pad)
+                  + b',\n' + pad + b'"class": ' + dumps(props['Class'], pad))
+            if "Value" in props:
+                raw_value = (tree_item.item.value if isinstance(tree_item.item, aaf2.properties.Property)
+                             else props.get("Value"))
+                write(b',\n' + pad + b'"value": ' + dumps(self._serialize_json_value(raw_value), pad))
+
+            children = filter(None, map(tree_item.child, range(tree_item.childCount())))
+            first_child = next(children, None)
+            if first_child is not None:
+                # Descend into the first child; the rest are picked up below.
+                write(b',\n' + pad + b'"children": [\n' + pad + indent)
+                stack.append((children, depth))
+                tree_item, depth = first_child, depth + 2
+                continue
+            write(b'\n' + indent * depth + b'}')
+
+            # Move on to the next sibling, closing every finished parent.
+            while stack:
+                children, parent_depth = stack[-1]
+                sibling = next(children, None)
+                if sibling is not None:
+                    tree_item, depth = sibling, parent_depth + 2
+                    write(b',\n' + indent * depth)
+                    break
+                stack.pop()
+                write(b'\n' + indent * (parent_depth + 1) + b']\n' + indent * parent_depth + b'}')
+            else:
+                return
 
     def _serialize_json_value(self, value):
+        value_type = type(value)
+        if value_type in _JSON_SCALAR_TYPES: return value
+        convert = _JSON_CONV.get(value_type)
+        if convert is not None: return convert(value)
         if isinstance(value, (str, int, float, bool, type(None))): return value
         if isinstance(value, (datetime.datetime, datetime.date, datetime.time)): return value.isoformat()
         if isinstance(value, uuid.UUID): return str(value)
@@ -592,94 +1005,137 @@ class Window(QtWidgets.QTreeView):
 
     @QtCore.Slot()
     def expand_all_recursive(self):
-        """Custom method to recursively expand all items in a lazy-loading model."""
+        """Recursively expands all items, loading the lazy model as it goes."""
+        model = self.model()
+        if not model: return
+        top_level_rows = model.rowCount(QtCore.QModelIndex())
+        if top_level_rows > EXPAND_ALL_WARN_ROWS:
+            reply = QtWidgets.QMessageBox.question(self, "Expand All",
+                                                   f"There are {top_level_rows} top-level items; expanding all of them may take a long time.\nContinue?",
+                                                   QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No,
+                                                   QtWidgets.QMessageBox.StandardButton.No)
+            if reply != QtWidgets.QMessageBox.StandardButton.Yes:
+                return
         print("Expanding all items...")
         self.setUpdatesEnabled(False)
-        
-        items_to_expand = [QtCore.QModelIndex()]
-        
-        head = 0
-        while head < len(items_to_expand):
-            parent_index = items_to_expand[head]
-            head += 1
-            
-            model = self.model()
-            if not model: continue
-            
-            for r in range(model.rowCount(parent_index)):
-                child_index = model.index(r, 0, parent_index)
-                if model.hasChildren(child_index):
-                    items_to_expand.append(child_index)
-
-        for index in reversed(items_to_expand):
-            if index.isValid():
-                self.expand(index)
-
-        self.setUpdatesEnabled(True)
+        try:
+            model.fetchAll()
+            self.expandRecursively(QtCore.QModelIndex(), -1)
+        finally:
+            self.setUpdatesEnabled(True)
         print("Finished expanding.")
 
     def loadAafFile(self, file_path, options):
         if not file_path or not options:
              self.setModel(None); self.setWindowTitle("AAFInspector"); self.current_file_path = None; return
         if self.aaf_file and self.current_file_path != file_path:
-            try: self.aaf_file.close()
-            except Exception as e: print(f"Error closing previous file: {e}")
-            self.aaf_file = None
+            # Closed once no pending request is reading from it
+            old_file, self.aaf_file = self.aaf_file, None
+            self._retireFile(old_file)
         self.current_file_path = file_path
         self.current_options = options.copy()
+        self._search_index = None
+        self.search_results = []
+        self.current_search_index = -1
+        self.last_search_term = ""
+        # The loader reads from the file while it works, so the view must not
+        # touch the previous model (which may share the file) in the meantime.
+        self.setModel(None)
+        self.setWindowTitle(f"Loading {os.path.basename(file_path)}... - AAFInspector")
+        self._load_id += 1
+        self._loads_pending[self._load_id] = self.aaf_file
+        self.loadRequested.emit(self._load_id, file_path, self.current_options, self.aaf_file)
+
+    def _retireFile(self, aaf_file):
+        """Closes an aaf file that is no longer shown, or once no pending request still uses it."""
+        if aaf_file is None or aaf_file is self.aaf_file:
+            return
+        if any(aaf_file is f for f in self._loads_pending.values()):
+            if all(aaf_file is not f for f in self._retired_files):
+                self._retired_files.append(aaf_file)
+            return
+        try: aaf_file.close()
+        except Exception as e: print(f"Error closing previous file: {e}")
+
+    def _loadFinished(self, request_id):
+        """
+        Forgets a request the loader has answered and closes the retired files nothing
+        uses now. Returns the file the request was handed, if any.
+        """
+        given_file = self._loads_pending.pop(request_id, None)
+        retired, self._retired_files = self._retired_files, []
+        for aaf_file in retired:
+            self._retireFile(aaf_file)
+        return given_file
+
+    @QtCore.Slot(int, object, object, object)
+    def _onAafLoaded(self, request_id, aaf_file, root_items, option_errors):
+        given_file = self._loadFinished(request_id)
+        if request_id != self._load_id:
+            # Superseded by a later request; drop the file it opened without leaking it
+            # (a file it was handed is still shown, or already retired)
+            if aaf_file is not given_file:
+                self._retireFile(aaf_file)
+            return
+        old_file, self.aaf_file = self.aaf_file, aaf_file
+        if old_file is not aaf_file:
+            self._retireFile(old_file)
+        file_path = self.current_file_path
         try:
-            if not self.aaf_file: self.aaf_file = aaf2.open(file_path, 'r')
-            f = self.aaf_file
-            
-            root_items = []
-            option_map = {
-                'toplevel': lambda f: list(f.content.toplevel()),
-                'compmobs': lambda f: list(f.content.compositionmobs()),
-                'mastermobs': lambda f: list(f.content.mastermobs()),
-                'sourcemobs': lambda f: list(f.content.sourcemobs()),
-                'dictionary': lambda f: f.dictionary,
-                'metadict': lambda f: f.metadict,
-                'root': lambda f: f.root,
-            }
-
-            for key in ['toplevel', 'compmobs', 'mastermobs', 'sourcemobs', 'dictionary', 'metadict', 'root']:
-                if self.current_options.get(key):
-                     try:
-                          print(f"Adding data from option: {key}")
-                          data = option_map[key](f)
-                          if isinstance(data, list):
-                              root_items.extend(data)
-                          else:
-                              root_items.append(data)
-                     except Exception as e:
-                          print(f"Error getting root data for option {key}: {e}")
-                          QtWidgets.QMessageBox.warning(self, "Data Error", f"Failed to retrieve data for option '{key}'.\nError: {e}")
-            
+            for key, e in option_errors:
+                QtWidgets.QMessageBox.warning(self, "Data Error", f"Failed to retrieve data for option '{key}'.\nError: {e}")
+
             if root_items:
-                model = AAFModel(root_items)
-                self.setModel(model)
-                self.expandToDepth(0)
+                # Nothing is painted until the model is attached and expanded
+                self.setUpdatesEnabled(False)
+                try:
+                    model = AAFModel(root_items)
+                    model.can_evict = lambda tree_item: not self.isExpanded(model.indexForItem(tree_item))
+                    self.setModel(model)
+                    self.expandToDepth(0)
+                    self.header().setSectionResizeMode(1, QtWidgets.QHeaderView.ResizeMode.Stretch)
+                    self.header().setStretchLastSection(False)
+                finally:
+                    self.setUpdatesEnabled(True)
+                # Measuring the columns walks every instantiated row, so it waits for the event loop
+                QtCore.QTimer.singleShot(0, self._resizeColumns)
             else:
                 QtWidgets.QMessageBox.warning(self, "No Data", "No display options selected or no data found for selection.")
                 self.setModel(None)
 
             self.setWindowTitle(f"{os.path.basename(file_path)} - AAFInspector")
-            self.resizeColumnToContents(0)
-            self.header().setSectionResizeMode(1, QtWidgets.QHeaderView.ResizeMode.Stretch)
-            self.resizeColumnToContents(2)
-            self.header().setStretchLastSection(False)
             self.setupFileWatcher(file_path)
         except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Error Loading File", f"Could not process AAF file:\n{file_path}\n\nError: {str(e)}")
-            self.setModel(None)
-            if self.aaf_file:
-                try: self.aaf_file.close()
-                except Exception: pass
-            self.aaf_file = None; self.current_file_path = None; self.setupFileWatcher(None)
+            self._onAafLoadFailed(request_id, str(e))
+
+    @QtCore.Slot()
+    def _resizeColumns(self):
+        if self.model() is not None:
+            self.resizeColumnToContents(0)
+            self.resizeColumnToContents(2)
+
+    @QtCore.Slot(int, str)
+    def _onAafLoadFailed(self, request_id, message):
+        self._loadFinished(request_id)
+        if request_id != self._load_id:
+            return
+        QtWidgets.QMessageBox.critical(self, "Error Loading File", f"Could not process AAF file:\n{self.current_file_path}\n\nError: {message}")
+        self.setModel(None)
+        self.setWindowTitle("AAFInspector")
+        old_file, self.aaf_file = self.aaf_file, None
+        self._retireFile(old_file)
+        self.current_file_path = None; self.setupFileWatcher(None)
 
     @QtCore.Slot(str)
     def fileChangedHandler(self, path):
-        if path == self.current_file_path:
+        # Restarting the timer folds repeated notifications into one prompt
+        self._changed_path = path
+        self._reload_timer.start(FILE_CHANGE_DEBOUNCE_MS)
+
+    @QtCore.Slot()
+    def _prompt_reload(self):
+        path, self._changed_path = self._changed_path, None
+        if path and path == self.current_file_path:
             reply = QtWidgets.QMessageBox.question(self, "File Changed",
                                                    f"The file '{os.path.basename(path)}' has been modified.\nDo you want to reload it?",
                                                    QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No,
@@ -698,9 +1154,15 @@ class Window(QtWidgets.QTreeView):
         if file_path and os.path.exists(file_path): self.fs_watcher.addPath(file_path)
 
     def closeEvent(self, event):
-        if self.aaf_file:
-            try: self.aaf_file.close()
-            except Exception as e: print(f"Error closing AAF file on exit: {e}")
+        self._loader_thread.quit()
+        self._loader_thread.wait()
+        # The loader has stopped, so nothing reads from these any more
+        for aaf_file in [self.aaf_file] + self._retired_files:
+            if aaf_file:
+                try: aaf_file.close()
+                except Exception as e: print(f"Error closing AAF file on exit: {e}")
+        self.aaf_file = None
+        self._retired_files = []
         super().closeEvent(event)
 
 if __name__ == "__main__":
@@ -7,26 +7,172 @@ from __future__ import (
 )
 import sys
 import os
-import json # Added for JSON export
-import datetime # Added for JSON export
 import uuid # Added for JSON export
+import collections
+import weakref
+import operator
+import itertools
+import hashlib
+import pickle
+import queue
+import logging
+import threading
+import time
 
 from PySide6 import QtCore
 from PySide6 import QtWidgets
-from PySide6 import QtGui
 
-# Try importing aaf2, handle potential ImportError
-try:
-    import aaf2
-except ImportError:
-    print("Error: aaf2 library not found.")
-    print("Please install it using: pip install aaf2")
-    sys.exit(1)
+from aaf_export import (
+    COMPILED as EXPORT_COMPILED,
+    export_json,
+    is_excluded,
+    json_head,
+    serialize_json_value,
+    snapshot_child,
+    snapshot_child_count,
+    snapshot_json_head,
+    stream_tree,
+)
+
+# aaf2 is imported by _import_aaf2() when the first file is loaded, so the
+# options dialog doesn't wait for it at startup
+aaf2 = None
+
+# Messages are formatted only when their level is enabled; set AAFINSPECTOR_LOG=DEBUG to see them all
+log = logging.getLogger("aafinspector")
+
+# Roles looked up once here rather than through the Qt enum on every data() call
+DISPLAY_ROLE = QtCore.Qt.ItemDataRole.DisplayRole
+TOOLTIP_ROLE = QtCore.Qt.ItemDataRole.ToolTipRole
+# Likewise for the index class used by the model's parent()/index() on every repaint
+QModelIndex = QtCore.QModelIndex
+
+# StrongRefSets with more members than this are listed in their stored order
+# instead of being sorted by key
+SET_SORT_LIMIT = 10000
+
+# Set key types whose ordering is that of their .int value. Sorting on .int
+# computes it once per key instead of twice per comparison in __lt__.
+# The aaf2 key types are added by _import_aaf2().
+INT_ORDERED_KEY_TYPES = (uuid.UUID,)
+
+# Property names of each classdef in display (alphabetical) order, shared by all
+# objects of that class: id(classdef) -> (weakref to classdef, [names], {names}).
+# ClassDefs aren't hashable, hence the id; the weak reference drops the entry
+# once the classdef (and its file) is gone, before the id can be reused.
+_classdef_prop_order = {}
+
+# Number of opened AAF files (the displayed one included) kept open for switching back.
+# The models built from each file are kept with it, so switching back to a view
+# that was already shown doesn't rebuild it.
+FILE_CACHE_SIZE = 3
+
+# Bytes read from each end of a file that is hashed by its ends rather than in full
+HASH_END_BYTES = 64 * 1024
+
+# Snapshots of fully walked trees are kept in the user cache directory, keyed by a hash
+# of the file's first and last HASH_END_BYTES plus its size and mtime. Changing
+# AAFINSPECTOR_CACHE_VERSION makes older snapshots unreachable; the oldest ones are
+# removed once the directory holds more than SNAPSHOT_CACHE_LIMIT bytes.
+AAFINSPECTOR_CACHE_VERSION = 1
+SNAPSHOT_CACHE_LIMIT = 256 * 1024 * 1024
+
+# Files up to this size are hashed in full to tell whether a change notification
+# changed anything; larger ones only by their ends (see _content_fingerprint()).
+FINGERPRINT_FULL_LIMIT = 32 * 1024 * 1024
+
+# Mobs read from the content storage at a time; more are read as the view scrolls to them
+MOB_FETCH_BATCH = 500
+
+# Rows of any other item shown at a time, for sets and vectors with thousands of
+# members; more are shown as the view scrolls to the end of them
+CHILD_FETCH_BATCH = 1000
+
+# How long the watched file has to stay unchanged before offering to reload it.
+# Saving an AAF usually takes several writes, and each one is reported separately.
+FILE_CHANGE_DEBOUNCE_MS = 300
+
+# On network shares, where QFileSystemWatcher misses changes or reports them in
+# floods, the file is checked with a stat() this often instead of being watched
+FILE_POLL_INTERVAL_MS = 60 * 1000
+
+# File system types (as QStorageInfo names them) taken to be network shares
+NETWORK_FILE_SYSTEMS = frozenset((
+    b"nfs", b"nfs4", b"cifs", b"smbfs", b"smb2", b"smb3", b"afpfs", b"webdav", b"davfs",
+    b"fuse.sshfs", b"9p", b"afs", b"ceph", b"glusterfs", b"fuse.glusterfs", b"lustre",
+))
+
+# A load that takes longer than this shows a busy indicator
+LOAD_PROGRESS_DELAY_MS = 500
+
+# Initial widths of the Name and Class columns, in average characters of the view's
+# font, so they follow its size and the screen's DPI. Sizing them to their contents
+# would measure every row laid out on load; "Auto-size Columns" does that on request.
+NAME_COLUMN_CHARS = 48
+CLASS_COLUMN_CHARS = 32
+
+# Tooltips are cut to this many characters; the repr of an aaf2 object, or the
+# full text of a long value, can be far more than a tooltip can show
+TOOLTIP_MAX_CHARS = 4096
+
+# The export progress dialog is updated every this many items, or this often,
+# whichever comes first; it only appears once an export has run this long.
+EXPORT_PROGRESS_ITEMS = 1024
+EXPORT_PROGRESS_INTERVAL = 0.05
+EXPORT_PROGRESS_DELAY = 0.5
+
+# The JSON export is written as it is walked (see aaf_export.stream_tree()).
+# Its text is handed to a writer thread in chunks of about this many characters,
+# with at most this many chunks waiting to be written.
+EXPORT_CHUNK_SIZE = 1 << 20
+EXPORT_QUEUE_CHUNKS = 8
+
+# How much of the tree the JSON export covers. Objects max_depth levels below the
+# root are written without their children (0 exports everything), and objects of
+# the excluded classes are left out along with everything below them.
+DEFAULT_EXPORT_OPTIONS = {
+    'max_depth': 0,
+    'excluded_classes': (),
+}
+
+# Display options in order of preference, and how each one's root data is read
+# from an open AAF file. The first selected option is the one shown.
+ROOT_OPTIONS = (
+    ('root', lambda f: f.root),
+    ('metadict', lambda f: f.metadict),
+    ('dictionary', lambda f: f.dictionary),
+    ('sourcemobs', lambda f: LazyList(f.content.sourcemobs())),
+    ('mastermobs', lambda f: LazyList(f.content.mastermobs())),
+    ('compmobs', lambda f: LazyList(f.content.compositionmobs())),
+    ('toplevel', lambda f: LazyList(f.content.toplevel())),
+)
+
+def _root_option(options):
+    """
+    Returns the key of the option in ROOT_OPTIONS that decides what is shown with
+    options, or None if none is selected and the ContentStorage is shown. Option
+    sets with the same root option show the same tree.
+    """
+    for key, _ in ROOT_OPTIONS:
+        if options.get(key):
+            return key
+    return None
+
+# User-friendly labels for the display options; unknown keys get a generated "Show ..." label
+OPTION_LABELS = {
+    'toplevel': "Top-Level Composition Mobs",
+    'compmobs': "Composition Mobs",
+    'mastermobs': "Master Mobs",
+    'sourcemobs': "Source Mobs",
+    'dictionary': "Dictionary",
+    'metadict': "MetaDictionary",
+    'root': "Root",
+}
 
 
 # --- Input Dialog Class (Unchanged from previous version) ---
 class InputDialog(QtWidgets.QDialog):
-    def __init__(self, default_options, parent=None):
+    def __init__(self, default_options, parent=None, export_options=None):
         super().__init__(parent)
         self.setWindowTitle("AAFInspector")
         self.setMinimumWidth(400)
@@ -34,6 +180,8 @@ class InputDialog(QtWidgets.QDialog):
         self.filePath = ""
         # Make a copy to avoid modifying the original dict passed in
         self.options = default_options.copy()
+        # Kept apart from the display options, which key the model and snapshot caches
+        self.export_options = dict(export_options or DEFAULT_EXPORT_OPTIONS)
 
         # --- Layouts ---
         mainLayout = QtWidgets.QVBoxLayout(self)
@@ -56,26 +204,10 @@ class InputDialog(QtWidgets.QDialog):
         optionsGroup = QtWidgets.QGroupBox("Display Options")
         self.optionCheckboxes = {} # Dictionary to hold checkboxes
 
-        # Define options with user-friendly labels (Incorporating your change)
-        option_labels = {
-            'toplevel': "Top-Level Composition Mobs", # Your label change
-            'compmobs': "Composition Mobs",
-            'mastermobs': "Master Mobs",
-            'sourcemobs': "Source Mobs",
-            'dictionary': "Dictionary",
-            'metadict': "MetaDictionary",
-            'root': "Root", # Your label change
-        }
-
-        # Ensure all keys from default_options are present (in case defaults change later)
-        for key in default_options:
-            if key not in option_labels:
-                 option_labels[key] = f"Show {key.capitalize()}" # Auto-generate fallback label
-
         # Create checkboxes based on keys in default_options (respecting its order)
         # Or use sorted(default_options.keys()) for alphabetical order
         for key in default_options.keys(): # Iterate using the order from the passed dict
-            label = option_labels.get(key, f"Show {key.capitalize()}") # Get label or generate
+            label = OPTION_LABELS.get(key) or f"Show {key.capitalize()}" # Get label or generate
             checkbox = QtWidgets.QCheckBox(label)
             # Set initial state from the potentially modified copy of options
             checkbox.setChecked(self.options.get(key, False))
@@ -84,6 +216,19 @@ class InputDialog(QtWidgets.QDialog):
 
         optionsGroup.setLayout(optionsLayout)
 
+        # --- Export Options Widgets ---
+        exportGroup = QtWidgets.QGroupBox("JSON Export Options")
+        exportLayout = QtWidgets.QFormLayout()
+        self.maxDepthSpinBox = QtWidgets.QSpinBox()
+        self.maxDepthSpinBox.setRange(0, 999)
+        self.maxDepthSpinBox.setSpecialValueText("Unlimited") # Shown for 0
+        self.maxDepthSpinBox.setValue(self.export_options['max_depth'])
+        self.excludedClassesLineEdit = QtWidgets.QLineEdit(", ".join(self.export_options['excluded_classes']))
+        self.excludedClassesLineEdit.setPlaceholderText("e.g. TaggedValue, ControlPoint")
+        exportLayout.addRow("Max depth:", self.maxDepthSpinBox)
+        exportLayout.addRow("Exclude classes:", self.excludedClassesLineEdit)
+        exportGroup.setLayout(exportLayout)
+
         # --- Standard Dialog Buttons ---
         self.buttonBox = QtWidgets.QDialogButtonBox(
             QtWidgets.QDialogButtonBox.StandardButton.Ok | QtWidgets.QDialogButtonBox.StandardButton.Cancel
@@ -94,6 +239,7 @@ class InputDialog(QtWidgets.QDialog):
         # --- Assemble Main Layout ---
         mainLayout.addLayout(fileLayout)
         mainLayout.addWidget(optionsGroup)
+        mainLayout.addWidget(exportGroup)
         mainLayout.addWidget(self.buttonBox)
 
     @QtCore.Slot()
@@ -132,8 +278,13 @@ class InputDialog(QtWidgets.QDialog):
             if key in self.options:
                  self.options[key] = checkbox.isChecked()
             else:
-                 print(f"Warning: Checkbox key '{key}' not found in internal options dict during accept.")
-
+                 log.warning("Checkbox key %r not found in internal options dict during accept.", key)
+        self.export_options = {
+            'max_depth': self.maxDepthSpinBox.value(),
+            'excluded_classes': tuple(name for name in
+                                      (part.strip() for part in self.excludedClassesLineEdit.text().split(","))
+                                      if name),
+        }
 
         super().accept() # Call the original accept method
 
@@ -141,49 +292,116 @@ class InputDialog(QtWidgets.QDialog):
         """Returns the selected file path and options dictionary."""
         return self.filePath, self.options
 
+    def getExportOptions(self):
+        """Returns the JSON export options dictionary."""
+        return self.export_options
+
 # --- TreeItem Class (Unchanged) ---
 class TreeItem(object):
-    # ... (No changes needed in TreeItem) ...
+    # One of these exists per displayed node, so no per-instance __dict__
+    __slots__ = ('parentItem', 'item', 'children', 'children_count', 'value',
+                 'loaded', 'index', 'references', '_name', '_class', '_repr', '_full_value')
+
     def __init__(self, item, parent=None, index=0):
         self.parentItem = parent
         self.item = item
-        self.children = {}
+        # One slot per row: a TreeItem, the raw item from extend() until that row is asked
+        # for, or None for set/vector members that haven't been read yet. Leaves, which
+        # most items are, keep sharing the empty tuple; a list is made on the first extend().
+        self.children = ()
         self.children_count = 0
-        self.properties = {}
+        self.value = None # Text of the Value column, set by setup() for the items that have one
         self.loaded = False
         self.index = index
-        self.references = []
+        self.references = None # StrongRefSet keys, read on first child access
+        self._name = None # Cached result of name()
+        self._class = None # Cached result of class_name()
+        self._repr = None # Tooltip text, built on first hover
+        self._full_value = None # Value column tooltip, likewise
 
     def columnCount(self):
         return 1
 
     def childCount(self):
-        self.setup()
+        if not self.loaded:
+            self.setup()
         return self.children_count
 
     def child(self, row):
-        self.setup()
-        if row in self.children:
-            return self.children[row]
-
-        if isinstance(self.item, aaf2.properties.StrongRefSetProperty):
-            if row < len(self.references): # Bounds check
-                key = self.references[row]
-                item = self.item.get(key)
-                t = TreeItem(item, self, row)
-            else: return None # Invalid row index
-
-        elif isinstance(self.item, aaf2.properties.StrongRefVectorProperty):
-            # Check bounds for vector access
-            if 0 <= row < len(self.item):
-                item = self.item.get(row)
-                t = TreeItem(item, self, row)
-            else: return None # Invalid row index
-        else:
-            return None
+        if not self.loaded:
+            self.setup()
+        if not 0 <= row < len(self.children):
+            return None # Invalid row index
+        t = self.children[row]
+        if type(t) is TreeItem:
+            return t
+        if t is not None:
+            # Wrapped only now that the row is actually used
+            t = self.children[row] = TreeItem(t, self, row)
+            return t
+
+        # A member of a StrongRef set or vector, read on first use
+        item_type = type(self.item)
+        handler = TreeItem._MEMBER_HANDLERS.get(item_type)
+        if handler is None:
+            handler = TreeItem._MEMBER_HANDLERS[item_type] = TreeItem._resolve_member_handler(self.item)
+        t = handler(self, row)
+        if t is None:
+            return None # Invalid row index
         self.children[row] = t
         return t
 
+    # --- Per-type child() handlers for the rows _setup_set/_setup_vector leave empty ---
+    # _MEMBER_HANDLERS works like _SETUP_HANDLERS; the aaf2 types are added by _import_aaf2().
+
+    @staticmethod
+    def _resolve_member_handler(item):
+        if isinstance(item, aaf2.properties.StrongRefSetProperty):
+            return TreeItem._set_member
+        if isinstance(item, aaf2.properties.StrongRefVectorProperty):
+            return TreeItem._vector_member
+        return TreeItem._no_member
+
+    def _set_member(self, row):
+        self._ensure_references()
+        if row < len(self.references): # Bounds check
+            return TreeItem(self.item.get(self.references[row]), self, row)
+        return None
+
+    def _vector_member(self, row):
+        # Check bounds for vector access
+        if 0 <= row < len(self.item):
+            return TreeItem(self.item.get(row), self, row)
+        return None
+
+    def _no_member(self, row):
+        return None
+
+    _MEMBER_HANDLERS = {}
+
+    def _ensure_references(self):
+        """Reads (and sorts) the keys of a StrongRefSet the first time one of its members is needed."""
+        if self.references is not None:
+            return
+        try:
+            # Ensure keys are hashable and sortable if possible
+            keys = list(self.item.references)
+            if len(keys) > SET_SORT_LIMIT:
+                self.references = keys # Too many to be worth sorting
+                return
+            key_type = type(keys[0]) if keys else None
+            if key_type in INT_ORDERED_KEY_TYPES and all(type(k) is key_type for k in keys):
+                self.references = sorted(keys, key=operator.attrgetter('int'))
+                return
+            # Attempt to sort, fallback if keys are not comparable
+            try:
+                self.references = sorted(keys)
+            except TypeError:
+                self.references = keys # Keep original order if sorting fails
+        except Exception as e:
+            log.warning("Error processing references for %s: %s", self.name(), e)
+            self.references = []
+
     def childNumber(self):
         # Return the stored index
         return self.index
@@ -193,13 +411,20 @@ class TreeItem(object):
         return self.parentItem
 
     def extend(self, items):
-        for i in items:
-            index = self.children_count
-            t = TreeItem(i, self, index)
-            self.children[index] = t
-            self.children_count += 1
+        # The items are stored as they are; child() wraps each one in a TreeItem on first use
+        if self.children:
+            self.children.extend(items)
+        else:
+            self.children = list(items)
+        self.children_count = len(self.children)
 
     def name(self):
+        # The name never changes for a given item, so it is only looked up once
+        if self._name is None:
+            self._name = self._lookup_name()
+        return self._name
+
+    def _lookup_name(self):
         item = self.item
         # Check for DummyItem first
         if isinstance(item, DummyItem):
@@ -216,6 +441,12 @@ class TreeItem(object):
         return self.class_name() # Fallback further to class name
 
     def class_name(self):
+        # Same as name(): looked up on first use only
+        if self._class is None:
+            self._class = self._lookup_class_name()
+        return self._class
+
+    def _lookup_class_name(self):
         item = self.item
          # Check for DummyItem first
         if isinstance(item, DummyItem):
@@ -223,116 +454,234 @@ class TreeItem(object):
 
 
         if isinstance(item, aaf2.core.AAFObject):
-            # Handle potential errors if classdef is missing (unlikely but safe)
-            return getattr(getattr(item, 'classdef', None), 'class_name', 'UnknownAAFObject')
+            # Handle potential errors if classdef is missing (unlikely but safe).
+            # aaf2 makes a new string each time; interned, every item of a class shares one.
+            class_name = getattr(getattr(item, 'classdef', None), 'class_name', 'UnknownAAFObject')
+            return sys.intern(class_name) if type(class_name) is str else class_name
         if hasattr(item, "class_name"):
             return item.class_name
         # Ensure we always return a string
-        return getattr(item, '__class__', type(None)).__name__
+        return type(item).__name__
+
+    def tooltip(self):
+        # repr() of an aaf2 object can chase into its classdef, so it is only done once
+        if self._repr is None:
+            item = self.item
+            if type(item) is SnapshotNode:
+                self._repr = item.tooltip[:TOOLTIP_MAX_CHARS] # The repr of the object the snapshot was taken from
+            else:
+                try:
+                    self._repr = repr(item)[:TOOLTIP_MAX_CHARS]
+                except Exception:
+                    self._repr = self.name() # Fallback tooltip
+        return self._repr
+
+    def value_tooltip(self):
+        # The full text of a truncated value, read once like tooltip(); others show as they are
+        if self._full_value is None:
+            text = self.value if self.value is not None else ''
+            # Check if the display value indicates truncation
+            if text.endswith("... (truncated)"):
+                item = self.item
+                try:
+                    if type(item) is SnapshotNode:
+                        text = item.full_value or text
+                    elif isinstance(item, aaf2.properties.Property):
+                        # Try to get the original full value string representation
+                        original_value = item.value
+                        if original_value is not None:
+                            text = str(original_value)
+                except Exception:
+                    pass # Fallback to truncated string if error
+            self._full_value = text[:TOOLTIP_MAX_CHARS]
+        return self._full_value
 
     def setup(self):
         if self.loaded:
             return
 
         item = self.item
-        # Handle DummyItem - it acts as a container for its target
-        if isinstance(item, DummyItem):
-             self.extend([item.item]) # Add the actual target as the child
-             self.properties['Name'] = self.name()
-             self.properties['Class'] = self.class_name()
-             self.loaded = True
-             return # Nothing more to do for DummyItem container itself
+        TreeItem._setup_handler(item)(self, item)
+        # The rest of the rows are added by AAFModel.fetchMore(); a LazyList reads its own batches
+        if self.children_count > CHILD_FETCH_BATCH and type(item) is not LazyList:
+            self.children_count = CHILD_FETCH_BATCH
 
+        # Name and Class aren't stored here; data() asks name()/class_name(), which cache them
+        self.loaded = True
 
+    def hasValue(self):
+        """Whether the item has a Value, so that showing the row needs setup()."""
+        # Only properties and snapshot nodes get one from setup()
+        handler = TreeItem._setup_handler(self.item)
+        return handler is TreeItem._setup_property or handler is TreeItem._setup_snapshot
+
+    def hasChildren(self):
+        """Whether the item has rows, answered for objects without listing their properties."""
+        if not self.loaded:
+            handler = TreeItem._setup_handler(self.item)
+            if handler is TreeItem._setup_object or handler is TreeItem._setup_source_clip \
+                    or handler is TreeItem._setup_dummy:
+                return True # Listed on the first expand; an object without properties loses its expander then
+        return self.childCount() > 0
+
+    # --- Per-type setup() handlers ---
+    # _SETUP_HANDLERS maps the exact type of the wrapped item to its handler.
+    # A type that isn't in it yet is resolved once with isinstance and added.
+
+    @staticmethod
+    def _setup_handler(item):
+        # One dict lookup on the exact type instead of an isinstance() chain per node
+        item_type = type(item)
+        handler = TreeItem._SETUP_HANDLERS.get(item_type)
+        if handler is None:
+            handler = TreeItem._SETUP_HANDLERS[item_type] = TreeItem._resolve_setup_handler(item)
+        return handler
+
+    @staticmethod
+    def _resolve_setup_handler(item):
+        # Handle DummyItem - it acts as a container for its target
+        if isinstance(item, DummyItem):
+            return TreeItem._setup_dummy
+        if isinstance(item, SnapshotNode):
+            return TreeItem._setup_snapshot
         if isinstance(item, list):
-            self.extend(item)
-
+            return TreeItem._setup_list
+        if isinstance(item, LazyList):
+            return TreeItem._setup_lazy_list
+        # SourceClip is checked before the AAFObject it derives from
+        if isinstance(item, aaf2.components.SourceClip):
+            return TreeItem._setup_source_clip
         if isinstance(item, aaf2.core.AAFObject):
-            try:
-                # Sort properties alphabetically by name for consistency
-                props = sorted(list(item.properties()), key=lambda p: getattr(p, 'name', ''))
-                self.extend(props)
-            except Exception as e:
-                 print(f"Error accessing properties for {self.name()}: {e}") # Handle potential errors
+            return TreeItem._setup_object
+        if isinstance(item, aaf2.properties.StrongRefProperty):
+            return TreeItem._setup_strongref
+        if isinstance(item, aaf2.properties.StrongRefVectorProperty):
+            return TreeItem._setup_vector
+        if isinstance(item, aaf2.properties.StrongRefSetProperty):
+            return TreeItem._setup_set
+        if isinstance(item, aaf2.properties.Property):
+            return TreeItem._setup_property
+        return TreeItem._setup_nothing
 
+    def _setup_dummy(self, item):
+        self.extend([item.item]) # Add the actual target as the child
 
-        elif isinstance(item, aaf2.properties.StrongRefProperty):
-            if item.value: # Handle cases where the ref might be null
-                self.extend([item.value])
+    def _setup_list(self, item):
+        self.extend(item)
 
-        elif isinstance(item, aaf2.properties.StrongRefVectorProperty):
-             try:
-                 self.children_count = len(item)
-             except Exception as e:
-                  print(f"Error getting length of StrongRefVectorProperty {self.name()}: {e}")
-                  self.children_count = 0
+    def _setup_snapshot(self, item):
+        if item.value is not None:
+            self.value = item.value
+        # The children are stored as plain tuples
+        self.extend([SnapshotNode._make(child) for child in item.children])
 
+    def _setup_lazy_list(self, item):
+        # Only the first batch; AAFModel.fetchMore() adds the rest as they are scrolled to
+        self.extend(item.first)
 
-        elif isinstance(item, aaf2.properties.StrongRefSetProperty):
-            try:
-                self.children_count = len(item)
-                # Sort references for consistent display (assuming they are comparable)
-                try:
-                    # Ensure keys are hashable and sortable if possible
-                    keys = list(item.references.keys())
-                    # Attempt to sort, fallback if keys are not comparable
-                    try:
-                        self.references = sorted(keys)
-                    except TypeError:
-                        self.references = keys # Keep original order if sorting fails
-                except Exception as e:
-                    print(f"Error processing references for {self.name()}: {e}")
-                    self.references = []
-                    self.children_count = 0
-            except Exception as e:
-                  print(f"Error getting length/references of StrongRefSetProperty {self.name()}: {e}")
-                  self.children_count = 0
-                  self.references = []
+    def _setup_object(self, item):
+        try:
+            # Sort properties alphabetically by name for consistency
+            self.extend(_sorted_properties(item))
+        except Exception as e:
+             log.warning("Error accessing properties for %s: %s", self.name(), e) # Handle potential errors
 
+    def _setup_source_clip(self, item):
+        self._setup_object(item)
+        # Add slot and mob references as children for convenience
+        try:
+            mob = item.mob
+            if mob:
+                # Use DummyItem for clearer representation
+                self.extend([DummyItem("Source Mob Ref", mob)])
+        except Exception as e:
+             log.warning("Error accessing SourceClip.mob for %s: %s", self.name(), e)
 
-        elif isinstance(item, (aaf2.properties.Property)):
-            try:
-                # Limit long string values for better display
-                v_raw = item.value
-                if isinstance(v_raw, (str, bytes)) and len(v_raw) > 100:
-                    # Use repr for clarity on type and potential non-printable chars
-                    v = repr(v_raw[:100]) + "... (truncated)"
-                elif isinstance(v_raw, (dict, list, tuple)) and len(str(v_raw)) > 100:
-                     v = str(type(v_raw)) + " ... (truncated)" # Show type for collections
-                else:
-                     v = str(v_raw)
-            except Exception as e: # Catch potential errors during value access/str conversion
-                v = f"<Error accessing value: {type(e).__name__}>"
-            self.properties['Value'] = v
+        try:
+            slot = item.slot
+            if slot:
+                # Use DummyItem
+                self.extend([DummyItem("Source Slot Ref", slot)])
+        except Exception as e:
+             log.warning("Error accessing SourceClip.slot for %s: %s", self.name(), e)
 
-        # Add slot and mob references as children for convenience
-        if isinstance(item, aaf2.components.SourceClip):
-             try:
-                 mob = item.mob
-                 if mob:
-                     # Use DummyItem for clearer representation
-                     self.extend([DummyItem("Source Mob Ref", mob)])
-             except Exception as e:
-                  print(f"Error accessing SourceClip.mob for {self.name()}: {e}")
+    def _setup_strongref(self, item):
+        if item.value: # Handle cases where the ref might be null
+            self.extend([item.value])
 
-             try:
-                 slot = item.slot
-                 if slot:
-                     # Use DummyItem
-                     self.extend([DummyItem("Source Slot Ref", slot)])
-             except Exception as e:
-                  print(f"Error accessing SourceClip.slot for {self.name()}: {e}")
+    def _setup_vector(self, item):
+        try:
+            self.children_count = len(item)
+        except Exception as e:
+             log.warning("Error getting length of StrongRefVectorProperty %s: %s", self.name(), e)
+             self.children_count = 0
+        self.children = [None] * self.children_count
 
+    def _setup_set(self, item):
+        try:
+            # Only the size is needed here; the keys are read and sorted by
+            # _ensure_references() once a member is actually shown
+            self.children_count = len(item)
+        except Exception as e:
+             log.warning("Error getting length of StrongRefSetProperty %s: %s", self.name(), e)
+             self.children_count = 0
+             self.references = []
+        self.children = [None] * self.children_count
 
-        # Set properties after potentially extending children
-        self.properties['Name'] = self.name()
-        self.properties['Class'] = self.class_name()
+    def _setup_property(self, item):
+        try:
+            # Limit long string values for better display
+            v_raw = item.value
+            if isinstance(v_raw, (str, bytes)) and len(v_raw) > 100:
+                # Use repr for clarity on type and potential non-printable chars
+                v = repr(v_raw[:100]) + "... (truncated)"
+            elif isinstance(v_raw, (dict, list, tuple)):
+                 # Every element adds at least 2 characters (", "), so more than 50
+                 # can't fit in 100 and the collection isn't turned into a string at all
+                 v = None if len(v_raw) > 50 else str(v_raw)
+                 if v is None or len(v) > 100:
+                      v = str(type(v_raw)) + " ... (truncated)" # Show type for collections
+            else:
+                 v = str(v_raw)
+        except Exception as e: # Catch potential errors during value access/str conversion
+            v = f"<Error accessing value: {type(e).__name__}>"
+        self.value = v
 
-        self.loaded = True
+    def _setup_nothing(self, item):
+        pass
+
+    # The aaf2 types are added by _import_aaf2()
+    _SETUP_HANDLERS = {
+        list: _setup_list,
+    }
+
+def _sorted_properties(item):
+    """Returns the properties of an AAFObject ordered by name, reusing the order worked out for its class."""
+    props = list(item.properties())
+    # Each name is read once; every ordering below reuses them
+    names = [getattr(p, 'name', '') for p in props]
+    by_name = dict(zip(names, props))
+    classdef = getattr(item, 'classdef', None)
+    if classdef is None or len(by_name) != len(props):
+        # No class to share the order with, or two properties with the same name.
+        # Sorted on the names alone, so equal ones keep their order.
+        pairs = sorted(zip(names, props), key=operator.itemgetter(0))
+        return [p for _, p in pairs]
+    key = id(classdef)
+    entry = _classdef_prop_order.get(key)
+    if entry is None or not by_name.keys() <= entry[2]:
+        # First object of this class, or one with a property the others didn't have
+        names = set(by_name)
+        if entry is not None:
+            names.update(entry[2])
+        ref = entry[0] if entry is not None else weakref.ref(classdef, lambda _, key=key: _classdef_prop_order.pop(key, None))
+        entry = _classdef_prop_order[key] = (ref, sorted(names), names)
+    return [by_name[name] for name in entry[1] if name in by_name]
 
 # --- DummyItem Class (Unchanged) ---
 class DummyItem:
-     # ... (No changes needed in DummyItem) ...
+     __slots__ = ('_name', 'item')
+
      def __init__(self, name, target_item):
          self._name = name
          self.item = target_item # The actual item this dummy points to
@@ -351,13 +700,48 @@ class DummyItem:
          if hasattr(target, "class_name"):
              return target.class_name
          # Ensure we always return a string
-         return getattr(target, '__class__', type(None)).__name__
+         return type(target).__name__
 
      def properties(self): # Make it behave somewhat like an AAFObject for the tree
          # Return the target item directly for the model to process
          return [self.item]
 
 
+# --- LazyList Class ---
+class LazyList:
+    """
+    The items of a generator, read from it a batch at a time. The first batch is
+    read when the LazyList is created (on the loader thread, where errors are
+    reported); fetch() reads the next one when the view needs more rows.
+    """
+    __slots__ = ('_iter', 'first', 'exhausted')
+    class_name = 'list' # Shown (and exported) the same as the list it replaces
+
+    def __init__(self, iterable, first_count=MOB_FETCH_BATCH):
+        self._iter = iter(iterable)
+        self.exhausted = False
+        self.first = self._take(first_count)
+
+    def _take(self, count):
+        items = list(itertools.islice(self._iter, count))
+        if len(items) < count:
+            self.exhausted = True
+            self._iter = None
+        return items
+
+    def fetch(self, count=MOB_FETCH_BATCH):
+        """Returns up to count more items, or an empty list once the generator is used up."""
+        if self.exhausted:
+            return []
+        try:
+            return self._take(count)
+        except Exception as e:
+            log.warning("Error reading more items: %s", e)
+            self.exhausted = True
+            self._iter = None
+            return []
+
+
 # --- AAFModel Class (Unchanged) ---
 class AAFModel(QtCore.QAbstractItemModel):
     # ... (No changes needed in AAFModel) ...
@@ -380,15 +764,73 @@ class AAFModel(QtCore.QAbstractItemModel):
                  return f"Column: {self.headers[section]}"
         return None
 
-    def columnCount(self, parent=QtCore.QModelIndex()): # Default parent is root
+    def columnCount(self, parent=QModelIndex()): # Default parent is root
         # The number of columns is fixed based on headers
         return len(self.headers)
 
-    def rowCount(self, parent=QtCore.QModelIndex()):
+    def rowCount(self, parent=QModelIndex()):
         parentItem = self.getItem(parent)
         # Ensure parentItem is valid before calling childCount
         return parentItem.childCount() if parentItem else 0
 
+    def hasChildren(self, parent=QModelIndex()):
+        # Asked for every row the view lays out, to draw its expander. The default
+        # counts the rows, which would list the properties of every object on screen.
+        return self.getItem(parent).hasChildren()
+
+    def canFetchMore(self, parent):
+        parentItem = self.getItem(parent)
+        if parentItem.children_count < len(parentItem.children):
+            return True
+        item = parentItem.item
+        return type(item) is LazyList and not item.exhausted
+
+    def fetchMore(self, parent):
+        parentItem = self.getItem(parent)
+        first = parentItem.childCount()
+        total = len(parentItem.children)
+        if first < total:
+            # The rows are already there, just not shown yet
+            last = min(total, first + CHILD_FETCH_BATCH) - 1
+            self.beginInsertRows(parent, first, last)
+            parentItem.children_count = last + 1
+            self.endInsertRows()
+            return
+        if type(parentItem.item) is not LazyList:
+            return
+        more = parentItem.item.fetch()
+        if more:
+            self.beginInsertRows(parent, first, first + len(more) - 1)
+            parentItem.extend(more)
+            self.endInsertRows()
+
+    def fetchAll(self):
+        """
+        Adds every remaining root row as one insertion: the rows held back from the
+        view (see fetchMore()) and, for a LazyList root, every batch not read yet.
+        """
+        root = QModelIndex()
+        if not self.canFetchMore(root):
+            return
+        rootItem = self.rootItem
+        first = rootItem.childCount()
+        more = []
+        if type(rootItem.item) is LazyList:
+            while True:
+                batch = rootItem.item.fetch()
+                if not batch:
+                    break
+                more.extend(batch)
+        last = len(rootItem.children) + len(more) - 1
+        if last >= first:
+            # One rowsInserted for the view instead of one per batch
+            self.beginInsertRows(root, first, last)
+            if more:
+                rootItem.extend(more)
+            else:
+                rootItem.children_count = last + 1
+            self.endInsertRows()
+
     def data(self, index, role):
         if not index.isValid():
             return None
@@ -397,67 +839,62 @@ class AAFModel(QtCore.QAbstractItemModel):
         if not item: # Safety check
              return None
 
-        # Ensure data is loaded before accessing properties, but only if needed for display roles
-        if role in (QtCore.Qt.ItemDataRole.DisplayRole, QtCore.Qt.ItemDataRole.ToolTipRole):
-            item.setup() # Load data if not already loaded
-
-        if role == QtCore.Qt.ItemDataRole.DisplayRole:
-            header_key = self.headers[index.column()]
-            # Directly access properties dict, handle DummyItem within TreeItem's setup/properties
-            return str(item.properties.get(header_key, ''))
-
-        elif role == QtCore.Qt.ItemDataRole.ToolTipRole:
-             header_key = self.headers[index.column()]
+        # Only display and tooltip roles are provided; nothing is loaded for the others
+        if role != DISPLAY_ROLE and role != TOOLTIP_ROLE:
+            return None
+        header_key = self.headers[index.column()]
+        # The name, class and tooltip don't need setup(); the value only does for items that have one.
+        # Objects on screen are set up once they are expanded (see hasChildren()).
+        if not item.loaded and header_key == 'Value' and item.hasValue():
+            item.setup()
+
+        if role == DISPLAY_ROLE:
+            if header_key == 'Name':
+                return str(item.name())
+            if header_key == 'Class':
+                return str(item.class_name())
+            # Only Property nodes have a Value
+            value = item.value
+            return value if value is not None else ''
+
+        else: # TOOLTIP_ROLE
              # Provide tooltip for Name and Class columns showing the item's internal representation
              if header_key in ('Name', 'Class'):
-                  try:
-                       return repr(item.item)
-                  except Exception:
-                       return item.name() # Fallback tooltip
-             # Provide full value as tooltip for Value column if it was truncated
+                  return item.tooltip()
+             # Provide full value as tooltip for Value column if it was truncated,
+             # or the value itself for consistency
              elif header_key == 'Value':
-                  raw_value_str = item.properties.get('Value', '')
-                  # Check if the display value indicates truncation
-                  if raw_value_str.endswith("... (truncated)"):
-                        try:
-                           # Try to get the original full value string representation
-                            original_value = getattr(item.item, 'value', None) if isinstance(item.item, aaf2.properties.Property) else None
-                            return str(original_value) if original_value is not None else raw_value_str
-                        except Exception:
-                             return raw_value_str # Fallback to truncated string if error
-                  # return None # No special tooltip if not truncated (or return the value itself?)
-                  # Let's return the value itself for consistency
-                  return raw_value_str
+                  return item.value_tooltip()
 
         return None # Default return for unhandled roles
 
 
     def parent(self, index):
         if not index.isValid():
-            return QtCore.QModelIndex()
+            return QModelIndex()
 
         childItem = self.getItem(index)
         if not childItem:
-            return QtCore.QModelIndex()
+            return QModelIndex()
 
         parentItem = childItem.parent()
 
-        if parentItem is None or parentItem == self.rootItem:
+        if parentItem is None or parentItem is self.rootItem:
             # This index belongs to a top-level item, its parent is the invisible root
-            return QtCore.QModelIndex()
+            return QModelIndex()
 
         # We need the row of parentItem within *its* parent (grandParentItem)
         # Use the index stored in TreeItem
         return self.createIndex(parentItem.childNumber(), 0, parentItem)
 
 
-    def index(self, row, column, parent=QtCore.QModelIndex()):
+    def index(self, row, column, parent=QModelIndex()):
          if not self.hasIndex(row, column, parent):
-             return QtCore.QModelIndex()
+             return QModelIndex()
 
          parentItem = self.getItem(parent)
          if not parentItem: # Should not happen if hasIndex passed, but safety first
-              return QtCore.QModelIndex()
+              return QModelIndex()
 
 
          childItem = parentItem.child(row) # child() handles loading if needed
@@ -468,78 +905,594 @@ class AAFModel(QtCore.QAbstractItemModel):
          else:
              # This might happen if child data isn't loaded yet, index out of bounds, or error in child()
              # print(f"Warning: Could not get childItem for row {row} in parent {parentItem.name()}")
-             return QtCore.QModelIndex()
+             return QModelIndex()
 
 
     def getItem(self, index):
         if index.isValid():
             item = index.internalPointer()
             # Check if the internal pointer is a valid TreeItem instance
-            if isinstance(item, TreeItem):
+            if item.__class__ is TreeItem:
                 return item
         # If index is invalid or pointer is not a TreeItem, return the root
         return self.rootItem
 
 
+_import_lock = threading.Lock()
+
+def _import_aaf2():
+    """Imports aaf2 on first use, along with the tables keyed on its types."""
+    if aaf2 is not None:
+        return
+    # The warm-up task and the loader thread can both get here at startup
+    with _import_lock:
+        _import_aaf2_locked()
+
+def _import_aaf2_locked():
+    global aaf2, INT_ORDERED_KEY_TYPES
+    if aaf2 is not None:
+        return
+    try:
+        import aaf2 as module
+    except ImportError:
+        raise ImportError("aaf2 library not found. Please install it using: pip install aaf2")
+    # Everything that uses the module or the tables runs once the module is set
+    INT_ORDERED_KEY_TYPES = (uuid.UUID, module.auid.AUID, module.mobid.MobID)
+    TreeItem._SETUP_HANDLERS.update({
+        module.components.SourceClip: TreeItem._setup_source_clip,
+        module.properties.StrongRefProperty: TreeItem._setup_strongref,
+        module.properties.StrongRefVectorProperty: TreeItem._setup_vector,
+        module.properties.StrongRefSetProperty: TreeItem._setup_set,
+        module.properties.Property: TreeItem._setup_property,
+    })
+    TreeItem._MEMBER_HANDLERS.update({
+        module.properties.StrongRefSetProperty: TreeItem._set_member,
+        module.properties.StrongRefVectorProperty: TreeItem._vector_member,
+    })
+    aaf2 = module
+
+
+# --- Snapshot Cache ---
+# A snapshot is the displayed tree of one file viewed with one set of options:
+# each node's display text, tooltips and export value, with its children as plain
+# tuples of the same fields. Showing a snapshot needs no aaf2 at all.
+SnapshotNode = collections.namedtuple(
+    'SnapshotNode', 'name class_name value full_value tooltip export_value children')
+
+def _snapshot_dir():
+    base = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.StandardLocation.CacheLocation)
+    return os.path.join(base, 'snapshots') if base else None
+
+def _hash_ends(h, f, size):
+    """Feeds the first and last HASH_END_BYTES of the open file f (of size bytes) to h."""
+    h.update(f.read(HASH_END_BYTES))
+    if size > HASH_END_BYTES:
+        f.seek(max(HASH_END_BYTES, size - HASH_END_BYTES))
+        h.update(f.read(HASH_END_BYTES))
+
+def _content_fingerprint(file_path):
+    """
+    Returns (size, digest) of file_path's contents, or None if it can't be read.
+    The digest covers the whole file up to FINGERPRINT_FULL_LIMIT bytes and only
+    its ends above that, where a same-sized change in the middle goes unnoticed.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size > FINGERPRINT_FULL_LIMIT:
+                _hash_ends(h, f, size)
+            else:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    h.update(chunk)
+    except OSError:
+        return None
+    return (size, h.digest())
+
+def _is_network_path(file_path):
+    """Whether file_path is on a network share, where its changes have to be polled for."""
+    path = os.path.abspath(file_path)
+    if path.startswith(("\\\\", "//")):
+        return True # UNC path
+    if sys.platform == "win32":
+        # A mapped drive reports the file system of the server (e.g. NTFS)
+        import ctypes
+        DRIVE_REMOTE = 4
+        return ctypes.windll.kernel32.GetDriveTypeW(os.path.splitdrive(path)[0] + "\\") == DRIVE_REMOTE
+    storage = QtCore.QStorageInfo(os.path.dirname(path))
+    return storage.isValid() and bytes(storage.fileSystemType()).lower() in NETWORK_FILE_SYSTEMS
+
+def _snapshot_key(file_path, options):
+    """Returns the key of the snapshot of file_path's current contents viewed with options."""
+    st = os.stat(file_path)
+    h = hashlib.sha256()
+    h.update(repr((AAFINSPECTOR_CACHE_VERSION, st.st_size, st.st_mtime_ns, _root_option(options))).encode('utf-8'))
+    # The ends of the file rather than all of it; size and mtime cover the rest
+    with open(file_path, 'rb') as f:
+        _hash_ends(h, f, st.st_size)
+    return h.hexdigest()
+
+def load_snapshot(file_path, options):
+    """Returns the root SnapshotNode saved for file_path and options, or None if there isn't one."""
+    directory = _snapshot_dir()
+    if not directory:
+        return None
+    try:
+        path = os.path.join(directory, _snapshot_key(file_path, options) + '.pkl')
+        with open(path, 'rb') as f:
+            root = SnapshotNode._make(pickle.load(f))
+        os.utime(path) # Marks it as recently used for pruning
+        return root
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log.warning("Error reading snapshot for %s: %s", file_path, e)
+        return None
+
+def save_snapshot(key, root):
+    """Saves root (a snapshot as plain tuples) under key, then prunes old snapshots."""
+    directory = _snapshot_dir()
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, key + '.pkl')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(root, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    _prune_snapshots(directory)
+
+def _prune_snapshots(directory):
+    """Removes the least recently used snapshots while there are more than SNAPSHOT_CACHE_LIMIT bytes."""
+    snapshots = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.pkl'):
+            st = entry.stat()
+            snapshots.append((st.st_atime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in snapshots)
+    for _, size, path in sorted(snapshots):
+        if total <= SNAPSHOT_CACHE_LIMIT:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+
+
+class SnapshotSaveTask(QtCore.QRunnable):
+    """
+    Writes a snapshot to disk on a QThreadPool thread. The snapshot itself is
+    taken on the GUI thread, which owns the aaf2 objects it is read from.
+    """
+    def __init__(self, file_path, key, root):
+        super().__init__()
+        self.file_path = file_path
+        self.key = key
+        self.root = root
+
+    def run(self):
+        try:
+            save_snapshot(self.key, self.root)
+            log.info("Saved snapshot of %s", self.file_path)
+        except Exception as e:
+            log.warning("Error saving snapshot of %s: %s", self.file_path, e)
+
+
+class WarmUpTask(QtCore.QRunnable):
+    """
+    Imports aaf2 on a QThreadPool thread while the startup dialog is open, so
+    the first load does not pay for the import.
+    """
+    def run(self):
+        try:
+            _import_aaf2()
+            log.debug("aaf2 imported during startup")
+        except ImportError as e:
+            # The loader reports this properly when a file is opened
+            log.debug("Warm-up skipped: %s", e)
+
+
+# --- JSON Export ---
+class ExportCancelled(Exception):
+    pass
+
+class ExportProgress:
+    """
+    Counts the items walked by an export and keeps a QProgressDialog up to date,
+    sampled rather than per item. tick() raises ExportCancelled once the user
+    has cancelled.
+    """
+    def __init__(self, parent, label):
+        self.label = label
+        self.count = 0
+        self.started = time.monotonic()
+        self.next_update = self.started + EXPORT_PROGRESS_INTERVAL
+        # The total is unknown until the walk ends, so the bar just shows activity
+        self.dialog = QtWidgets.QProgressDialog(label, "Cancel", 0, 0, parent)
+        self.dialog.setWindowModality(QtCore.Qt.WindowModality.WindowModal)
+        self.dialog.setAutoReset(False)
+        self.dialog.setAutoClose(False)
+        self.dialog.reset() # Stays hidden until the export turns out to be slow
+
+    def tick(self):
+        self.count += 1
+        if self.count % EXPORT_PROGRESS_ITEMS == 0 or time.monotonic() >= self.next_update:
+            self._update()
+
+    def _update(self):
+        now = time.monotonic()
+        self.next_update = now + EXPORT_PROGRESS_INTERVAL
+        if not self.dialog.isVisible() and now - self.started >= EXPORT_PROGRESS_DELAY:
+            self.dialog.show()
+        if self.dialog.isVisible():
+            self.dialog.setLabelText(f"{self.label}\n{self.count} items")
+            QtCore.QCoreApplication.processEvents()
+        # Cancelling also hides the dialog
+        if self.dialog.wasCanceled():
+            raise ExportCancelled()
+
+    def close(self):
+        if self.dialog is None:
+            return
+        log.debug("Export walked %d items in %.2fs", self.count, time.monotonic() - self.started)
+        self.dialog.close()
+        self.dialog.deleteLater()
+        self.dialog = None
+
+
+class ExportWriteTask(QtCore.QRunnable):
+    """
+    Encodes and writes the chunks of text put on its queue to a binary file on a
+    QThreadPool thread, until it gets None. Only the walk of the tree has to stay
+    on the GUI thread, which owns the aaf2 objects it reads.
+    """
+    def __init__(self, f):
+        super().__init__()
+        self.f = f
+        self.chunks = queue.Queue(EXPORT_QUEUE_CHUNKS)
+        self.error = None
+        self.finished = threading.Event()
+
+    def run(self):
+        try:
+            finished = False
+            while not finished:
+                # Whatever has queued up while the last write ran goes out in one go
+                batch = [self.chunks.get()]
+                while True:
+                    try:
+                        batch.append(self.chunks.get_nowait())
+                    except queue.Empty:
+                        break
+                if batch[-1] is None: # Only ever put last
+                    finished = True
+                    batch.pop()
+                if self.error is not None or not batch:
+                    continue # Keep taking chunks so the GUI thread never waits on a full queue
+                try:
+                    self._write([chunk.encode('utf-8') for chunk in batch])
+                except Exception as e:
+                    self.error = e
+        finally:
+            self.finished.set()
+
+    def _write(self, buffers):
+        if len(buffers) > 1 and hasattr(os, 'writev'): # Not on Windows
+            # One system call for all of them, without joining them first
+            self.f.flush()
+            written = os.writev(self.f.fileno(), buffers)
+            if written == sum(map(len, buffers)):
+                return
+            buffers = [b"".join(buffers)[written:]] # Short write; the file object retries the rest
+        for data in buffers:
+            self.f.write(data)
+
+class ExportWriter:
+    """The file object the export is streamed to; collects its text into chunks for an ExportWriteTask."""
+    def __init__(self, f):
+        self.parts = []
+        self.size = 0
+        self.task = ExportWriteTask(f)
+        QtCore.QThreadPool.globalInstance().start(self.task)
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= EXPORT_CHUNK_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self.task.error is not None:
+            raise self.task.error # Stop walking once nothing more can be written
+        if self.parts:
+            self.task.chunks.put("".join(self.parts))
+            self.parts = []
+            self.size = 0
+
+    def close(self, discard=False):
+        """Waits for the writer thread to finish, raising the error it hit, if any."""
+        try:
+            if not discard:
+                self._flush()
+        finally:
+            self.task.chunks.put(None)
+            self.task.finished.wait()
+        if self.task.error is not None:
+            raise self.task.error
+
+
+# How Window._stream_node() counts the children of a TreeItem; the ones of a
+# snapshot's plain tuples are reached through aaf_export
+def _tree_item_child_count(tree_item):
+    return len(tree_item.children)
+
+
+# --- Background Loader ---
+class AafLoader(QtCore.QObject):
+    """
+    Opens the AAF file and gathers the root data for the selected option on a
+    worker thread, so the window stays responsive while large files are read.
+    The open file is handed back to the window along with the root data.
+    """
+    loaded = QtCore.Signal(int, object, object, object) # request id, aaf file, root data, [(option, error message)]
+    failed = QtCore.Signal(int, object) # request id, exception
+
+    @QtCore.Slot(int, str, object, object)
+    def run(self, request_id, file_path, options, aaf_file):
+        try:
+            # Also needed to show a snapshot, whose tree is handled by the same code
+            _import_aaf2()
+            if not aaf_file:
+                snapshot = load_snapshot(file_path, options)
+                if snapshot is not None:
+                    # No file to hand back; the snapshot is all the window needs
+                    log.info("Using saved snapshot of: %s", file_path)
+                    self.loaded.emit(request_id, None, snapshot, [])
+                    return
+                aaf_file = aaf2.open(file_path, 'r')
+                log.info("Successfully opened: %s", file_path)
+        except Exception as e:
+            self.failed.emit(request_id, e)
+            return
+
+        f = aaf_file
+        root_data = None
+        load_errors = [] # Reported by the window in one message box, which it owns
+        key = _root_option(options)
+        if key is not None:
+             try:
+                  root_data = dict(ROOT_OPTIONS)[key](f)
+                  log.debug("Using root data from option: %s", key)
+             except Exception as e:
+                  log.error("Error getting root data for option %s: %s", key, e)
+                  load_errors.append((key, str(e)))
+                  root_data = None
+        else:
+             log.warning("No specific view option selected, defaulting to ContentStorage.")
+             try:
+                  root_data = f.content
+             except Exception as e:
+                  log.error("Error accessing default f.content: %s", e)
+                  load_errors.append(("ContentStorage", str(e)))
+                  root_data = None
+
+        self.loaded.emit(request_id, f, root_data, load_errors)
+
+
 # --- Main Window Class (MODIFIED for Context Menu and JSON Export) ---
 class Window(QtWidgets.QTreeView):
     # Add import for QMenu, QAction if not already covered by QtWidgets/QtGui
     # from PySide6.QtWidgets import QMenu (usually covered)
     # from PySide6.QtGui import QAction
 
+    # Asks the loader thread for a file: request id, path, options, already open aaf file or None
+    loadRequested = QtCore.Signal(int, str, object, object)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.resize(800, 700)
         self.setAlternatingRowColors(True)
-        self.setUniformRowHeights(False)
+        # Every row is a single line of text in the same font, so Qt can size one row for all
+        self.setUniformRowHeights(True)
         self.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
         self.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
 
         # Enable context menu policy
         self.setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.showContextMenu) # Connect signal
+        self._buildContextMenu()
+        self._buildReloadBanner()
 
         self.current_file_path = None
         self.current_options = {}
+        self.export_options = dict(DEFAULT_EXPORT_OPTIONS)
         self.aaf_file = None
         self.fs_watcher = None
+        self._watched_dir = None # Directory of the watched file, to notice it being replaced
+        self._watched_stamp = None # _fileStamp() of the file when its watch was (re)added
+        self._shown_path = None # File whose data was shown last, and its _fileStamp() then
+        self._shown_stamp = None
+        self._content_fp = None # _content_fingerprint() of the file when its data was shown
+        # Change notifications restart this timer; the reload prompt is shown once it runs out
+        self._changed_path = None
+        self._reload_timer = QtCore.QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(FILE_CHANGE_DEBOUNCE_MS)
+        self._reload_timer.timeout.connect(self._promptReload)
+        # Load request of a reload still in progress, and whether the file changed meanwhile
+        self._reload_id = None
+        self._changed_during_reload = False
+        # Stands in for the watcher for files on network shares (see setupFileWatcher())
+        self._poll_timer = QtCore.QTimer(self)
+        self._poll_timer.setInterval(FILE_POLL_INTERVAL_MS)
+        self._poll_timer.timeout.connect(self._pollFile)
+        # Shown once a load has been running for a while
+        self._load_progress = None
+        self._load_progress_timer = QtCore.QTimer(self)
+        self._load_progress_timer.setSingleShot(True)
+        self._load_progress_timer.setInterval(LOAD_PROGRESS_DELAY_MS)
+        self._load_progress_timer.timeout.connect(self._showLoadProgress)
+        # Big sets are shown in batches (see CHILD_FETCH_BATCH)
+        self.verticalScrollBar().valueChanged.connect(self._fetchMoreVisible)
+        # Recently opened files by path, least recently used first:
+        # path -> ((mtime, size), aaf file, {_root_option() of the options: model})
+        self._file_cache = collections.OrderedDict()
+
+        # Files are opened on a worker thread that lives as long as the window.
+        # Each request carries an id so results of a superseded load can be dropped.
+        self._load_id = 0
+        # The aaf file (or None) handed to each request the loader hasn't answered yet,
+        # and files no longer cached that a pending request may still be reading
+        self._loads_pending = {}
+        self._retired_files = []
+        self._loader_thread = QtCore.QThread(self)
+        self._loader = AafLoader()
+        self._loader.moveToThread(self._loader_thread)
+        self._loader_thread.finished.connect(self._loader.deleteLater)
+        self.loadRequested.connect(self._loader.run)
+        self._loader.loaded.connect(self._onAafLoaded)
+        self._loader.failed.connect(self._onAafLoadFailed)
+        self._loader_thread.start()
 
     # --- Context Menu Implementation ---
-    @QtCore.Slot(QtCore.QPoint)
-    def showContextMenu(self, point):
-        """Shows the context menu at the requested point."""
+    def _buildContextMenu(self):
+        """Creates the context menu and its actions once; showContextMenu() only updates them."""
         menu = QtWidgets.QMenu(self)
-        model_is_loaded = self.model() is not None
 
         # Action to re-open the options dialog
-        changeAction = QtGui.QAction("Change AAF/Options...", self)
-        changeAction.triggered.connect(self.showOptionsDialog)
-        changeAction.setEnabled(bool(self.current_file_path))
-        menu.addAction(changeAction)
+        self._change_action = menu.addAction("Change AAF/Options...")
+        self._change_action.triggered.connect(self.showOptionsDialog)
 
         menu.addSeparator()
 
         # Action to export data to JSON
-        exportJsonAction = QtGui.QAction("Export to JSON...", self)
-        exportJsonAction.triggered.connect(self.exportToJson)
-        exportJsonAction.setEnabled(model_is_loaded)
-        menu.addAction(exportJsonAction)
+        self._export_json_action = menu.addAction("Export to JSON...")
+        self._export_json_action.triggered.connect(self.exportToJson)
 
         # Actions for expanding/collapsing the tree
         menu.addSeparator()
-        expandAllAction = QtGui.QAction("Expand All", self)
-        expandAllAction.triggered.connect(self.expandAll)
-        expandAllAction.setEnabled(model_is_loaded)
-        menu.addAction(expandAllAction)
+        self._expand_action = menu.addAction("Expand All")
+        self._expand_action.triggered.connect(self.expandAll)
+
+        self._expand_depth_action = menu.addAction("Expand to Depth...")
+        self._expand_depth_action.triggered.connect(self.expandToDepthDialog)
+
+        self._collapse_action = menu.addAction("Collapse All")
+        self._collapse_action.triggered.connect(self.collapseAll)
+
+        menu.addSeparator()
+        self._autosize_action = menu.addAction("Auto-size Columns")
+        self._autosize_action.triggered.connect(self.autoSizeColumns)
+
+        # Actions that need a model to work on
+        self._model_actions = (self._export_json_action, self._expand_action,
+                               self._expand_depth_action, self._collapse_action,
+                               self._autosize_action)
+        self._context_menu = menu
 
-        collapseAllAction = QtGui.QAction("Collapse All", self)
-        collapseAllAction.triggered.connect(self.collapseAll)
-        collapseAllAction.setEnabled(model_is_loaded)
-        menu.addAction(collapseAllAction)
+    @QtCore.Slot(QtCore.QPoint)
+    def showContextMenu(self, point):
+        """Shows the context menu at the requested point."""
+        model_is_loaded = self.model() is not None
+        self._change_action.setEnabled(bool(self.current_file_path))
+        for action in self._model_actions:
+            action.setEnabled(model_is_loaded)
 
         # Execute the menu
         globalPos = self.mapToGlobal(point)
-        menu.exec(globalPos)
+        self._context_menu.exec(globalPos)
+
+    # --- Reload Banner ---
+    def _buildReloadBanner(self):
+        """Creates the bar offering to reload a changed file, shown along the bottom of the tree."""
+        banner = QtWidgets.QFrame(self)
+        banner.setFrameShape(QtWidgets.QFrame.Shape.StyledPanel)
+        banner.setAutoFillBackground(True)
+        layout = QtWidgets.QHBoxLayout(banner)
+        layout.setContentsMargins(6, 3, 6, 3)
+        self._reload_label = QtWidgets.QLabel(banner)
+        layout.addWidget(self._reload_label, 1)
+        reloadButton = QtWidgets.QPushButton("Reload", banner)
+        reloadButton.clicked.connect(self._reloadChangedFile)
+        layout.addWidget(reloadButton)
+        dismissButton = QtWidgets.QPushButton("Dismiss", banner)
+        dismissButton.clicked.connect(self._dismissReload)
+        layout.addWidget(dismissButton)
+        banner.hide()
+        self._reload_banner = banner
+
+    def _placeReloadBanner(self):
+        # A QTreeView has no layout of its own, so the banner is laid over the bottom of the viewport
+        area = self.viewport().geometry()
+        height = self._reload_banner.sizeHint().height()
+        self._reload_banner.setGeometry(area.left(), area.bottom() + 1 - height, area.width(), height)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._reload_banner.isVisible():
+            self._placeReloadBanner()
+
+    @QtCore.Slot()
+    def _reloadChangedFile(self):
+        """Reloads the current file after it was changed on disk."""
+        self._reload_banner.hide()
+        if not self.current_file_path:
+            return
+        log.info("Reloading file due to external change...")
+        # The open file may no longer match what is on disk, even if the mtime looks the same
+        self.setModel(None)
+        self._dropCachedFile(self.current_file_path)
+        self.aaf_file = None
+        load_id = self._load_id
+        self.loadAafFile(self.current_file_path, self.current_options)
+        if self._load_id != load_id and self._loads_pending:
+            self._reload_id = self._load_id # Further changes wait for it; see _endReload()
+
+    @QtCore.Slot()
+    def _dismissReload(self):
+        """Keeps showing the loaded data after the file was changed on disk."""
+        self._reload_banner.hide()
+        log.debug("User chose not to reload.")
+        # Writers that replace the file drop it from the watcher, so watch it again
+        self.setupFileWatcher(self.current_file_path)
+
+    @QtCore.Slot()
+    def autoSizeColumns(self):
+        """Fits the Name and Class columns to the rows currently shown."""
+        self.resizeColumnToContents(0)
+        self.resizeColumnToContents(2)
+
+    @QtCore.Slot()
+    def _fetchMoreVisible(self):
+        """
+        Shows the next batch of an item's rows once the last one shown scrolls into view.
+        QTreeView itself only does that for the item at the very end of the tree.
+        """
+        model = self.model()
+        if model is None:
+            return
+        height = self.viewport().height()
+        index = self.indexAt(QtCore.QPoint(0, 0))
+        while index.isValid() and self.visualRect(index).top() < height:
+            parent = index.parent()
+            if index.row() == model.rowCount(parent) - 1 and model.canFetchMore(parent):
+                model.fetchMore(parent)
+            index = self.indexBelow(index)
+
+    @QtCore.Slot()
+    def expandToDepthDialog(self):
+        """Asks for a number of levels and expands the tree that far in one pass."""
+        depth, ok = QtWidgets.QInputDialog.getInt(self, "Expand to Depth", "Levels to expand:", 1, 1, 100)
+        if not ok:
+            return
+        # expandToDepth() lays the tree out once; with updates off it is also painted only once.
+        # (expandAll() followed by collapsing would load every item of the lazy model first.)
+        self.setUpdatesEnabled(False)
+        try:
+            self.expandToDepth(depth - 1)
+        finally:
+            self.setUpdatesEnabled(True)
 
     # --- JSON Export Implementation ---
     @QtCore.Slot()
@@ -567,191 +1520,478 @@ class Window(QtWidgets.QTreeView):
         )
 
         if not filePath:
-            print("JSON export cancelled by user.")
+            log.debug("JSON export cancelled by user.")
             return
 
+        progress = ExportProgress(self, "Exporting to JSON...")
         try:
-            print("Starting JSON export...")
-            # This can be time-consuming, consider a progress bar for very large files
-            # For now, we'll just block the UI.
-            json_data = self._convert_node_to_dict(model.rootItem)
+            log.debug("Starting JSON export (%s)...", "compiled" if EXPORT_COMPILED else "pure Python")
+            # The export covers all mobs, not just the batches shown so far
+            model.fetchAll()
 
-            print(f"Writing JSON data to: {filePath}")
-            with open(filePath, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, indent=4, ensure_ascii=False)
+            log.debug("Writing JSON data to: %s", filePath)
+            max_depth = self.export_options['max_depth']
+            excluded_classes = frozenset(self.export_options['excluded_classes'])
+            try:
+                with open(filePath, 'wb') as f:
+                    writer = ExportWriter(f)
+                    try:
+                        self._stream_node(model.rootItem, writer, progress, max_depth, excluded_classes)
+                    except BaseException:
+                        writer.close(discard=True)
+                        raise
+                    writer.close()
+            except BaseException:
+                # Don't leave half a JSON file behind (but never remove a device or pipe)
+                try:
+                    if os.path.isfile(filePath):
+                        os.remove(filePath)
+                except OSError:
+                    pass
+                raise
+            progress.close()
 
             QtWidgets.QMessageBox.information(self, "Export Successful", f"Data successfully exported to:\n{filePath}")
-            print("JSON export finished successfully.")
-
+            log.info("JSON export finished successfully.")
+            # The whole tree has just been walked, so keeping it for later sessions is cheap now
+            root = self._saveSnapshot(model) if not max_depth and not excluded_classes else None
+            if root is not None:
+                # Nothing is left for the live model to read, so the file can be let go
+                self._switchToSnapshot(root)
+
+        except ExportCancelled:
+            progress.close()
+            log.debug("JSON export cancelled during the walk.")
         except Exception as e:
-            print(f"Error during JSON export: {e}")
+            progress.close()
+            log.error("Error during JSON export: %s", e)
             QtWidgets.QMessageBox.critical(self, "Export Failed", f"An error occurred while exporting to JSON.\n\nError: {e}")
 
+    def _stream_node(self, root, f, progress=None, max_depth=0, excluded_classes=frozenset()):
+        """
+        Writes root and its descendants to f as JSON with aaf_export.stream_tree().
+        Objects max_depth levels down are written without their children, marked
+        "truncated" if they have any; nothing below them is set up.
+        """
+        if type(root.item) is SnapshotNode:
+            # A snapshot is written straight from its plain tuples, without a TreeItem
+            # being made and set up for every node the view never showed
+            stream_tree(root.item, f, snapshot_json_head, snapshot_child, snapshot_child_count,
+                        progress, max_depth, excluded_classes)
+        else:
+            # The head of each item sets it up, so its children can be counted after that
+            stream_tree(root, f, self._node_json_head, TreeItem.child, _tree_item_child_count,
+                        progress, max_depth, excluded_classes)
+
     # UPDATED with the filtering logic provided by the user
-    def _convert_node_to_dict(self, tree_item):
-        """Recursively converts a TreeItem and its descendants to a dictionary, skipping redundant tracks."""
-        tree_item.setup()
+    def _node_json_head(self, tree_item, depth, progress=None, excluded_classes=frozenset()):
+        """
+        Returns the opening of tree_item's JSON object at the given indent depth, up to
+        the end of its last field before "children", or None for skipped redundant tracks
+        and excluded classes.
+        """
+        if progress is not None:
+            progress.tick()
+        if not tree_item.loaded: # Not a call per node just to find out it's done
+            tree_item.setup()
 
         name = tree_item.name()
         class_name = tree_item.class_name()
+        if is_excluded(name, class_name, excluded_classes):
+            return None
 
-        # Skip noisy TimelineMobSlots like A1–A8 and Data
-        # Using .lower() for case-insensitivity as a good practice
-        EXCLUDED_NAMES = {"a1", "a2", "a3", "a4", "a5", "a6", "a7", "a8", "data"}
-        if class_name == "TimelineMobSlot" and name.lower() in EXCLUDED_NAMES:
+        # Include value if present. setup() only gives properties one (a snapshot,
+        # whose nodes have their own, is exported by aaf_export), so no type check is needed.
+        value = None
+        if tree_item.value is not None:
+            value = export_json(serialize_json_value(tree_item.item.value))
+        return json_head(name, class_name, value, depth)
+
+    def _saveSnapshot(self, model):
+        """
+        Saves the tree of model on disk, if it was built from the file as it is now.
+        Returns the root SnapshotNode, or None if no snapshot was taken.
+        """
+        file_path = self.current_file_path
+        if type(model.rootItem.item) is SnapshotNode:
+            return None # Already shown from a snapshot
+        entry = self._file_cache.get(file_path)
+        if entry is None or entry[1] is not self.aaf_file or entry[0] != self._fileStamp(file_path):
+            return None # Changed on disk since the model was built
+        try:
+            # The key is worked out now, while the file is known to match the model
+            key = _snapshot_key(file_path, self.current_options)
+            root = self._snapshotNode(model.rootItem)
+        except Exception as e:
+            log.warning("Error taking snapshot of %s: %s", file_path, e)
             return None
+        QtCore.QThreadPool.globalInstance().start(SnapshotSaveTask(file_path, key, root))
+        return SnapshotNode._make(root)
 
-        data = {
-            "name": name,
-            "class": class_name,
-        }
+    def _switchToSnapshot(self, root):
+        """Shows root in place of the live model, keeping what is expanded and selected, and closes the file."""
+        model = self.model()
+        # Only expanded items are descended into, so this stays close to what is on screen.
+        # (A loop rather than a recursive closure, whose reference cycle would keep the
+        # old model alive until the garbage collector frees it on whichever thread it runs.)
+        # Each entry is the path of the root or an expanded item and how many of its rows were shown.
+        shown = [((), model.rowCount(QModelIndex()))]
+        pending = [(QModelIndex(), ())]
+        while pending:
+            parent, path = pending.pop()
+            for row in range(model.rowCount(parent)):
+                index = model.index(row, 0, parent)
+                if self.isExpanded(index):
+                    shown.append((path + (row,), model.rowCount(index)))
+                    pending.append((index, path + (row,)))
+        shown.sort(key=lambda entry: len(entry[0])) # Parents before their children
+        current = []
+        index = self.currentIndex()
+        while index.isValid():
+            current.insert(0, (index.row(), index.column()))
+            index = index.parent()
+        scroll = self.verticalScrollBar().value()
+
+        # The snapshot has the same rows in the same order, so the paths carry over
+        model = AAFModel(root)
+        self.setModel(model)
+        for path, rows in shown:
+            index = QModelIndex()
+            for row in path:
+                index = model.index(row, 0, index)
+            if path:
+                self.expand(index)
+            # Big sets are shown in batches; show as many of their rows as before
+            while model.rowCount(index) < rows and model.canFetchMore(index):
+                model.fetchMore(index)
+        if current:
+            index = QModelIndex()
+            for row, column in current:
+                while row >= model.rowCount(index) and model.canFetchMore(index):
+                    model.fetchMore(index)
+                index = model.index(row, column, index)
+            self.setCurrentIndex(index)
+        self.verticalScrollBar().setValue(scroll)
+
+        file_path = self.current_file_path
+        log.debug("Closing %s; its tree is kept as a snapshot", file_path)
+        self._dropCachedFile(file_path)
+        self.aaf_file = None
 
-        # Include value if present
-        if "Value" in tree_item.properties:
-            raw_value = (
-                tree_item.item.value
-                if isinstance(tree_item.item, aaf2.properties.Property)
-                else tree_item.properties.get("Value")
-            )
-            data["value"] = self._serialize_json_value(raw_value)
-
-        # Recurse through children
-        children = []
-        for i in range(tree_item.childCount()):
-            child = tree_item.child(i)
-            if not child:
+    def _snapshotNode(self, root):
+        """Returns root and everything below it as the plain tuple form of a SnapshotNode."""
+        # Walked with an explicit stack rather than recursion, so deep files don't
+        # pay for a Python frame per node or run into the recursion limit.
+        # Each frame is [tree_item, head, children, next_row], head being every field but the children.
+        stack = [[root, self._snapshotHead(root), [], 0]]
+        while True:
+            frame = stack[-1]
+            tree_item, row = frame[0], frame[3]
+            if row < len(tree_item.children):
+                frame[3] = row + 1
+                child = tree_item.child(row)
+                if child:
+                    stack.append([child, self._snapshotHead(child), [], 0])
                 continue
-            child_dict = self._convert_node_to_dict(child)
-            if child_dict:
-                children.append(child_dict)
-
-        if children:
-            data["children"] = children
-
-        return data
-
-    def _serialize_json_value(self, value):
-        """Converts a Python value from the AAF model into a JSON-serializable format."""
-        if isinstance(value, (str, int, float, bool, type(None))):
-            return value
-        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
-            return value.isoformat()
-        if isinstance(value, uuid.UUID):
-            return str(value)
-        if isinstance(value, bytes):
-            return repr(value)  # e.g., b'\\x01\\x02'
-        if isinstance(value, dict):
-            return {str(k): self._serialize_json_value(v) for k, v in value.items()}
-        if isinstance(value, (list, tuple)):
-            return [self._serialize_json_value(v) for v in value]
-        # For any other unhandled type (like other AAF objects), fall back to its string representation
-        return str(value)
+            stack.pop()
+            node = frame[1] + (tuple(frame[2]),)
+            if not stack:
+                return node
+            stack[-1][2].append(node)
+
+    def _snapshotHead(self, tree_item):
+        """Returns the fields of tree_item's SnapshotNode other than its children."""
+        if not tree_item.loaded:
+            tree_item.setup()
+        value = tree_item.value
+        full_value = export_value = None
+        if value is not None:
+            try:
+                # As in _node_json_head(), only properties have a value; a snapshot isn't snapshotted again
+                raw_value = tree_item.item.value
+            except Exception:
+                raw_value = value # The display text already says what went wrong
+            export_value = serialize_json_value(raw_value)
+            if value.endswith("... (truncated)"):
+                full_value = str(raw_value)
+        return (tree_item.name(), tree_item.class_name(), value, full_value,
+                tree_item.tooltip(), export_value)
+
     # --- End JSON Export ---
 
     @QtCore.Slot()
     def showOptionsDialog(self):
         """Creates and shows the InputDialog, pre-filled with current settings."""
         if not self.current_options or not self.current_file_path:
-             print("No current file/options available to modify.")
+             log.debug("No current file/options available to modify.")
              return
 
-        dialog = InputDialog(self.current_options, self)
+        dialog = InputDialog(self.current_options, self, self.export_options)
         dialog.filePathLineEdit.setText(self.current_file_path)
         dialogResult = dialog.exec()
 
         if dialogResult == QtWidgets.QDialog.DialogCode.Accepted:
             new_file_path, new_options = dialog.getResults()
-            print(f"Re-loading with new settings: {new_file_path}, {new_options}")
+            self.export_options = dialog.getExportOptions()
+            log.debug("Re-loading with new settings: %s, %s", new_file_path, new_options)
             self.loadAafFile(new_file_path, new_options)
         else:
-            print("Options dialog cancelled.")
+            log.debug("Options dialog cancelled.")
 
     def loadAafFile(self, file_path, options):
         """Loads or reloads the AAF file with given options."""
+        self._reload_banner.hide() # Any pending change is to the file being replaced
         if not file_path or not options:
-             print("Error: Missing file path or options for loading.")
+             log.error("Missing file path or options for loading.")
              self.setModel(None)
              self.setWindowTitle("AAFInspector")
+             if self.current_file_path:
+                  self._dropCachedFile(self.current_file_path)
              self.current_file_path = None
              self.current_options = {}
-             if self.aaf_file:
-                  try: self.aaf_file.close()
-                  except Exception: pass
-                  self.aaf_file = None
+             self.aaf_file = None
              self.setupFileWatcher(None) # Stop watching
              return
 
-        if self.aaf_file and self.current_file_path != file_path:
-            try:
-                print(f"Closing previous file: {self.current_file_path}")
-                self.aaf_file.close()
-            except Exception as e:
-                print(f"Error closing previous file: {e}")
-            self.aaf_file = None
-
         self.current_file_path = file_path
         self.current_options = options.copy()
-        print(f"Attempting to load AAF: {file_path}")
-        print(f"With options: {options}")
+        log.debug("Attempting to load AAF: %s", file_path)
+        log.debug("With options: %s", options)
+
+        # A cached model is only used while the loader is idle, since a load in
+        # progress may be reading from the same file
+        stamp = self._fileStamp(file_path) # One stat for both cache lookups below
+        model = self._cachedModel(file_path, self.current_options, stamp) if not self._loads_pending else None
+        if model is not None:
+            log.debug("Using the model already built for these options.")
+            self._load_id += 1 # Drops the result of a load still in progress
+            self._hideLoadProgress()
+            self.aaf_file = self._file_cache[file_path][1]
+            self._showModel(file_path, model, stamp)
+            return
+
+        # The loader reads from the file while it works, so the view must not
+        # touch the previous model (which may share the file) in the meantime.
+        # The previous file itself stays open in the cache.
+        self.setModel(None)
+        self.aaf_file = None
+        self.setWindowTitle(f"Loading {os.path.basename(file_path)}... - AAFInspector")
+        self._load_id += 1
+        given_file = self._cachedFile(file_path, stamp)
+        self._loads_pending[self._load_id] = given_file
+        self.loadRequested.emit(self._load_id, file_path, self.current_options, given_file)
+        if self._load_progress is None:
+            self._load_progress_timer.start()
+        else:
+            self._load_progress.setLabelText(f"Loading {os.path.basename(file_path)}...")
+
+    @QtCore.Slot()
+    def _showLoadProgress(self):
+        """Shows a busy indicator for the load in progress, which can be given up on."""
+        name = os.path.basename(self.current_file_path)
+        # The loader can't tell how far it has got, so the bar just shows activity
+        self._load_progress = QtWidgets.QProgressDialog(f"Loading {name}...", "Cancel", 0, 0, self)
+        self._load_progress.setWindowTitle("AAFInspector")
+        self._load_progress.setWindowModality(QtCore.Qt.WindowModality.WindowModal)
+        self._load_progress.canceled.connect(self._cancelLoad)
+        self._load_progress.show()
+
+    def _hideLoadProgress(self):
+        self._load_progress_timer.stop()
+        if self._load_progress is not None:
+            self._load_progress.canceled.disconnect(self._cancelLoad)
+            self._load_progress.close()
+            self._load_progress.deleteLater()
+            self._load_progress = None
 
+    @QtCore.Slot()
+    def _cancelLoad(self):
+        """Stops waiting for the load in progress. The loader still finishes, and its file is closed."""
+        log.debug("Load cancelled by user: %s", self.current_file_path)
+        self._load_id += 1 # Drops its result
+        self._hideLoadProgress()
+        self.setWindowTitle("AAFInspector")
+
+    # --- Open File Cache ---
+    def _cachedFile(self, file_path, stamp):
+        """Returns the open aaf file for file_path if it hasn't been modified since it was opened.
+        stamp is the current _fileStamp() of file_path."""
+        entry = self._file_cache.get(file_path)
+        if entry is None:
+            return None
+        cached_stamp, aaf_file, _ = entry
+        if cached_stamp is None or cached_stamp != stamp:
+            log.debug("Cached file changed on disk, reopening: %s", file_path)
+            self._dropCachedFile(file_path)
+            return None
+        self._file_cache.move_to_end(file_path)
+        return aaf_file
+
+    def _cachedModel(self, file_path, options, stamp):
+        """Returns the model already built from the unchanged file_path for options, if any."""
+        if self._cachedFile(file_path, stamp) is None:
+            return None
+        return self._file_cache[file_path][2].get(_root_option(options))
+
+    def _cacheFile(self, file_path, aaf_file):
+        """Keeps aaf_file open for later loads of file_path, closing the least recently used extras."""
+        entry = self._file_cache.get(file_path)
+        # Models built from this same open file stay valid
+        models = entry[2] if entry is not None and entry[1] is aaf_file else {}
+        self._file_cache[file_path] = (self._fileStamp(file_path), aaf_file, models)
+        self._file_cache.move_to_end(file_path)
+        while len(self._file_cache) > FILE_CACHE_SIZE:
+            old_path, (_, old_file, _) = self._file_cache.popitem(last=False)
+            log.debug("Closing cached file: %s", old_path)
+            self._retireFile(old_file)
+
+    def _cacheModel(self, file_path, options, model):
+        """Keeps model for later loads of the cached file_path with the same options."""
+        entry = self._file_cache.get(file_path)
+        if entry is not None:
+            entry[2][_root_option(options)] = model
+
+    def _dropCachedFile(self, file_path):
+        """Closes and forgets the cached file for file_path (and its models), if any."""
+        entry = self._file_cache.pop(file_path, None)
+        if entry is not None:
+            self._retireFile(entry[1])
+
+    def _retireFile(self, aaf_file):
+        """Closes an aaf file that is no longer cached, or once no pending request still uses it."""
+        if aaf_file is None:
+            return
+        if any(aaf_file is f for f in self._loads_pending.values()):
+            if all(aaf_file is not f for f in self._retired_files):
+                self._retired_files.append(aaf_file)
+            return
+        try: aaf_file.close()
+        except Exception as e: log.warning("Error closing cached file: %s", e)
+
+    def _loadFinished(self, request_id):
+        """
+        Forgets a request the loader has answered and closes the retired files nothing
+        uses now. Returns the file the request was handed, if any.
+        """
+        given_file = self._loads_pending.pop(request_id, None)
+        retired, self._retired_files = self._retired_files, []
+        for aaf_file in retired:
+            self._retireFile(aaf_file)
+        return given_file
+
+    @staticmethod
+    def _fileStamp(file_path):
+        """
+        Returns what identifies the file at file_path as it is now (device, inode,
+        mtime, size), from a single stat, or None if it is missing.
+        """
         try:
-            if not self.aaf_file:
-                self.aaf_file = aaf2.open(file_path, 'r')
-                print(f"Successfully opened: {file_path}")
-
-            f = self.aaf_file
-            root_data = None
-            option_map = {
-                'root': lambda f: f.root,
-                'metadict': lambda f: f.metadict,
-                'dictionary': lambda f: f.dictionary,
-                'sourcemobs': lambda f: list(f.content.sourcemobs()),
-                'mastermobs': lambda f: list(f.content.mastermobs()),
-                'compmobs': lambda f: list(f.content.compositionmobs()),
-                'toplevel': lambda f: list(f.content.toplevel()),
-            }
-
-            found_option = False
-            for key in ['root', 'metadict', 'dictionary', 'sourcemobs', 'mastermobs', 'compmobs', 'toplevel']:
-                if self.current_options.get(key):
-                     try:
-                          root_data = option_map[key](f)
-                          print(f"Using root data from option: {key}")
-                          found_option = True
-                          break
-                     except Exception as e:
-                          print(f"Error getting root data for option {key}: {e}")
-                          QtWidgets.QMessageBox.warning(self, "Data Error", f"Failed to retrieve data for option '{key}'.\nError: {e}")
-                          root_data = None
-                          found_option = True
-                          break
-
-            if not found_option:
-                 print("Warning: No specific view option selected, defaulting to ContentStorage.")
-                 try:
-                      root_data = f.content
-                 except Exception as e:
-                      print(f"Error accessing default f.content: {e}")
-                      root_data = None
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        # A file deleted and created again can get its inode back; mtime and size tell them apart
+        return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    @QtCore.Slot(int, object, object, object)
+    def _onAafLoaded(self, request_id, aaf_file, root_data, load_errors):
+        """Builds the model from the root data gathered by the loader thread."""
+        given_file = self._loadFinished(request_id)
+        self._endReload(request_id)
+        if request_id == self._load_id:
+            self._hideLoadProgress()
+        else:
+            # Superseded by a later request; drop the file it opened without leaking it
+            # (a file it was handed is still cached, or already retired)
+            if aaf_file is not given_file and all(aaf_file is not cached for _, cached, _ in self._file_cache.values()):
+                self._retireFile(aaf_file)
+            return
 
+        # The file now belongs to the GUI thread
+        self.aaf_file = aaf_file
+        file_path = self.current_file_path
+        if aaf_file is not None: # None when the root data is a saved snapshot
+            self._cacheFile(file_path, aaf_file)
+        try:
             if root_data is not None:
                 model = AAFModel(root_data)
-                self.setModel(model)
-                print("Model set successfully.")
-                self.expandToDepth(0)
+                self._cacheModel(file_path, self.current_options, model)
             else:
-                QtWidgets.QMessageBox.warning(self, "No Data", "Could not retrieve valid data to display based on selected options.")
-                self.setModel(None)
-                print("Setting model to None as root_data is None.")
-
-            self.setWindowTitle(f"{os.path.basename(file_path)} - AAFInspector")
-            self.resizeColumnToContents(0)
-            self.header().setSectionResizeMode(1, QtWidgets.QHeaderView.ResizeMode.Stretch)
-            self.resizeColumnToContents(2)
-            self.header().setStretchLastSection(False)
-            self.setupFileWatcher(file_path)
-
-        except FileNotFoundError:
+                model = None
+            self._showModel(file_path, model)
+
+            # The errors of the load, if any, in a single message box once the view is updated
+            if load_errors or root_data is None:
+                lines = [f"Failed to retrieve data for option '{key}'.\nError: {e}" for key, e in load_errors]
+                if root_data is None:
+                    lines.append("Could not retrieve valid data to display based on selected options.")
+                title = "No Data" if root_data is None else "Data Error"
+                QtWidgets.QMessageBox.warning(self, title, "\n\n".join(lines))
+
+        except Exception as e:
+            self._loadFailed(request_id, e)
+
+    def _showModel(self, file_path, model, stamp=None):
+        """Displays model (built from file_path, or None for nothing) and watches the file.
+        stamp is the _fileStamp() of file_path if the caller already has it."""
+        if model is not None:
+            # Nothing is sorted in this view; make sure setting the model can't start a sort
+            sorting = self.isSortingEnabled()
+            self.setSortingEnabled(False)
+            self.setModel(model)
+            self.setSortingEnabled(sorting)
+            log.debug("Model set successfully.")
+            # The tree starts collapsed; use "Expand to Depth..." to open it further
+        else:
+            self.setModel(None)
+            log.debug("Setting model to None as root_data is None.")
+
+        self.setWindowTitle(f"{os.path.basename(file_path)} - AAFInspector")
+        header = self.header()
+        char_width = self.fontMetrics().averageCharWidth()
+        self.setColumnWidth(0, NAME_COLUMN_CHARS * char_width)
+        header.setSectionResizeMode(1, QtWidgets.QHeaderView.ResizeMode.Stretch)
+        self.setColumnWidth(2, CLASS_COLUMN_CHARS * char_width)
+        header.setStretchLastSection(False)
+        if stamp is None:
+            stamp = self._fileStamp(file_path)
+        if stamp != self._shown_stamp or file_path != self._shown_path:
+            self._content_fp = _content_fingerprint(file_path)
+        self._shown_stamp = stamp
+        self._shown_path = file_path
+        # Watched once control is back in the event loop, so adding the watch (a slow
+        # call on some file systems) doesn't hold up the first paint of the tree
+        QtCore.QTimer.singleShot(0, self, lambda: self._watchShownFile(file_path, stamp))
+
+    def _watchShownFile(self, file_path, stamp):
+        """Watches file_path as shown by _showModel(), unless another file was loaded since."""
+        if file_path == self.current_file_path and file_path == self._shown_path:
+            self.setupFileWatcher(file_path, stamp)
+
+    @QtCore.Slot(int, object)
+    def _onAafLoadFailed(self, request_id, e):
+        """Handles a file the loader thread could not open."""
+        self._loadFinished(request_id)
+        self._endReload(request_id)
+        if request_id == self._load_id:
+            self._hideLoadProgress()
+        self._loadFailed(request_id, e)
+
+    def _endReload(self, request_id):
+        """Ends the reload that request_id was for, if any, passing on a change made while it ran."""
+        if request_id != self._reload_id:
+            return
+        self._reload_id = None
+        if self._changed_during_reload:
+            self._changed_during_reload = False
+            if self.current_file_path:
+                self.fileChangedHandler(self.current_file_path)
+
+    def _loadFailed(self, request_id, e):
+        """Reports a file that could not be opened or displayed."""
+        if request_id != self._load_id:
+            return # Superseded by a later request
+        file_path = self.current_file_path
+        if isinstance(e, FileNotFoundError):
              QtWidgets.QMessageBox.critical(self, "Error", f"File not found:\n{file_path}")
              self.setWindowTitle("AAFInspector - File Not Found")
              self.setModel(None)
@@ -759,74 +1999,183 @@ class Window(QtWidgets.QTreeView):
              self.current_file_path = None
              self.setupFileWatcher(None)
              return
-        except Exception as e:
-            print(f"An unexpected error occurred during loading: {e}")
-            QtWidgets.QMessageBox.critical(self, "Error Loading File", f"Could not process AAF file:\n{file_path}\n\nError: {str(e)}")
-            self.setWindowTitle(f"AAFInspector - Error loading {os.path.basename(file_path)}")
-            self.setModel(None)
-            if self.aaf_file:
-                try: self.aaf_file.close()
-                except Exception: pass
-            self.aaf_file = None
-            self.current_file_path = None
-            self.setupFileWatcher(None)
-            return
+
+        log.error("An unexpected error occurred during loading: %s", e)
+        QtWidgets.QMessageBox.critical(self, "Error Loading File", f"Could not process AAF file:\n{file_path}\n\nError: {str(e)}")
+        self.setWindowTitle(f"AAFInspector - Error loading {os.path.basename(file_path)}")
+        self.setModel(None)
+        if self.aaf_file:
+            # Closed along with its cache entry, or on its own if it isn't the cached one
+            entry = self._file_cache.get(file_path)
+            self._dropCachedFile(file_path)
+            if entry is None or entry[1] is not self.aaf_file:
+                self._retireFile(self.aaf_file)
+        self.aaf_file = None
+        self.current_file_path = None
+        self.setupFileWatcher(None)
 
     @QtCore.Slot(str)
     def fileChangedHandler(self, path):
         """Handles the signal from QFileSystemWatcher."""
         if path == self.current_file_path:
-            print(f"Detected change in: {path}")
-            reply = QtWidgets.QMessageBox.question(self, "File Changed",
-                                                   f"The file '{os.path.basename(path)}' has been modified.\nDo you want to reload it?",
-                                                   QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No,
-                                                   QtWidgets.QMessageBox.StandardButton.Yes)
-            if reply == QtWidgets.QMessageBox.StandardButton.Yes:
-                print("Reloading file due to external change...")
-                self.loadAafFile(self.current_file_path, self.current_options)
-            else:
-                print("User chose not to reload.")
-                self.setupFileWatcher(self.current_file_path)
+            if self._reload_id is not None:
+                # The file is being read again; one check once that is done covers this
+                log.debug("Change during reload of: %s", path)
+                self._changed_during_reload = True
+                return
+            log.debug("Detected change in: %s", path)
+            # Restarting the timer folds a burst of writes into one prompt
+            self._changed_path = path
+            self._reload_timer.start()
 
         else:
-            print(f"Ignoring change signal for path not currently loaded: {path}")
+            log.debug("Ignoring change signal for path not currently loaded: %s", path)
             if self.fs_watcher and path in self.fs_watcher.files():
                  self.fs_watcher.removePaths([path])
 
-    def setupFileWatcher(self, file_path):
-        """Sets up or resets the file system watcher for a single path."""
+    @QtCore.Slot()
+    def _promptReload(self):
+        """Offers to reload the file once it has stopped changing, without blocking the window."""
+        path, self._changed_path = self._changed_path, None
+        if path and path == self.current_file_path:
+            stamp = self._fileStamp(path)
+            if stamp is None:
+                # Removed, or in the middle of being replaced; _onDirChanged() calls
+                # back here once it is back
+                log.debug("Watched file is gone for now: %s", path)
+                return
+            if stamp == self._shown_stamp:
+                # Only touched (e.g. its access time); what is shown is still current
+                log.debug("No change to the shown file: %s", path)
+                self.setupFileWatcher(path, stamp)
+                return
+            if self._content_fp is not None and _content_fingerprint(path) == self._content_fp:
+                # Rewritten with the same bytes (or only its mtime was set)
+                log.debug("Contents of the shown file are unchanged: %s", path)
+                self._shown_stamp = stamp
+                self.setupFileWatcher(path, stamp)
+                return
+            self._reload_label.setText(f"The file '{os.path.basename(path)}' has been modified.")
+            self._placeReloadBanner()
+            self._reload_banner.show()
+            self._reload_banner.raise_()
+
+    def setupFileWatcher(self, file_path, stamp=None):
+        """Sets up or resets the file system watcher for a single path.
+        stamp is the _fileStamp() of file_path if the caller already has it."""
         if not self.fs_watcher:
              self.fs_watcher = QtCore.QFileSystemWatcher(self)
              try:
                   self.fs_watcher.fileChanged.connect(self.fileChangedHandler)
+                  self.fs_watcher.directoryChanged.connect(self._onDirChanged)
              except (TypeError, RuntimeError) as e:
-                  print(f"Error connecting file watcher signal initially: {e}")
+                  log.error("Error connecting file watcher signal initially: %s", e)
 
+        # Saving by writing a temporary file and renaming it over the original drops
+        # the watch on the file, so its directory is watched too (once per directory)
+        dir_path = os.path.dirname(os.path.abspath(file_path)) if file_path else None
+
+        # files() keeps listing a file whose watch was dropped when it was replaced,
+        # so the file's identity is compared as well
+        if stamp is None and file_path:
+            stamp = self._fileStamp(file_path)
         current_paths = self.fs_watcher.files()
+
+        if file_path and _is_network_path(file_path):
+            # Polled rather than watched; see _pollFile()
+            if current_paths:
+                self.fs_watcher.removePaths(current_paths)
+            if self._watched_dir:
+                self.fs_watcher.removePath(self._watched_dir)
+                self._watched_dir = None
+            self._watched_stamp = stamp
+            if not self._poll_timer.isActive():
+                self._poll_timer.start()
+                log.debug("Polling path on a network share: %s", file_path)
+            return
+        self._poll_timer.stop()
+        if (stamp is not None and stamp == self._watched_stamp and current_paths == [file_path]
+                and dir_path == self._watched_dir):
+            return # Already watching exactly this file
         if current_paths:
             self.fs_watcher.removePaths(current_paths)
+        self._watched_stamp = None
 
-        if file_path and os.path.exists(file_path):
+        if dir_path != self._watched_dir:
+            if self._watched_dir:
+                self.fs_watcher.removePath(self._watched_dir)
+            self._watched_dir = dir_path if dir_path and self.fs_watcher.addPath(dir_path) else None
+
+        if stamp is not None:
             if self.fs_watcher.addPath(file_path):
-                 print(f"Now watching path: {file_path}")
+                 self._watched_stamp = stamp
+                 log.debug("Now watching path: %s", file_path)
             else:
-                 print(f"Warning: Failed to add path to watcher: {file_path}")
+                 log.warning("Failed to add path to watcher: %s", file_path)
+
+    @QtCore.Slot(str)
+    def _onDirChanged(self, dir_path):
+        """Watches the current file again if it was replaced, and treats that as a change."""
+        path = self.current_file_path
+        if not path:
+            return
+        stamp = self._fileStamp(path)
+        if stamp is None or stamp == self._watched_stamp:
+            return # Gone for now, or another file in the directory changed
+        # The old watch (if any) belongs to the replaced file
+        if path in self.fs_watcher.files():
+            self.fs_watcher.removePath(path)
+        if self.fs_watcher.addPath(path):
+            self._watched_stamp = stamp
+            log.debug("Watching replaced file again: %s", path)
+        self.fileChangedHandler(path)
+
+    @QtCore.Slot()
+    def _pollFile(self):
+        """Checks the current file on a network share for a change, in place of the watcher."""
+        path = self.current_file_path
+        if not path:
+            self._poll_timer.stop()
+            return
+        stamp = self._fileStamp(path)
+        if stamp is None or stamp == self._watched_stamp:
+            return # Gone for now (e.g. being replaced), or unchanged
+        self._watched_stamp = stamp
+        self.fileChangedHandler(path)
 
     def closeEvent(self, event):
         """Ensure the AAF file is closed when the window closes."""
-        print("Close event triggered for main window.")
-        if self.aaf_file:
+        log.debug("Close event triggered for main window.")
+        self._reload_timer.stop()
+        self._poll_timer.stop()
+        self._hideLoadProgress()
+        # Let a load in progress finish before the file is closed under it
+        self._loader_thread.quit()
+        self._loader_thread.wait()
+        # ...and let snapshots still being written finish
+        QtCore.QThreadPool.globalInstance().waitForDone()
+        # The displayed file is in the cache along with the other recently opened ones
+        while self._file_cache:
+            path, (_, aaf_file, _) = self._file_cache.popitem()
             try:
-                self.aaf_file.close()
-                print(f"Closed AAF file on exit: {self.current_file_path}")
+                aaf_file.close()
+                log.debug("Closed AAF file on exit: %s", path)
             except Exception as e:
-                print(f"Error closing AAF file on exit: {e}")
+                log.warning("Error closing AAF file on exit: %s", e)
+        # The loader has stopped, so nothing reads from the retired files any more
+        for aaf_file in self._retired_files:
+            try: aaf_file.close()
+            except Exception as e: log.warning("Error closing AAF file on exit: %s", e)
+        self._retired_files = []
+        self.aaf_file = None
         super().closeEvent(event)
 
 
 # --- Main Execution Block (Unchanged) ---
 if __name__ == "__main__":
 
+    logging.basicConfig(level=os.environ.get("AAFINSPECTOR_LOG", "WARNING").upper(),
+                        format="%(levelname)s: %(message)s")
     app = QtWidgets.QApplication(sys.argv)
     app.setApplicationName("AAFInspector")
     
@@ -840,17 +2189,29 @@ if __name__ == "__main__":
         'root': False,
     }
 
+    QtCore.QThreadPool.globalInstance().start(WarmUpTask())
+
+    # The dialog is opened without a nested event loop so the warm-up runs
+    # alongside it; the window is created once the dialog is finished.
+    windows = []
     initial_dialog = InputDialog(default_options, parent=None)
-    dialogResult = initial_dialog.exec()
 
-    if dialogResult == QtWidgets.QDialog.DialogCode.Accepted:
-        selected_file_path, selected_options = initial_dialog.getResults()
+    def onDialogFinished(dialogResult):
+        if dialogResult == QtWidgets.QDialog.DialogCode.Accepted:
+            selected_file_path, selected_options = initial_dialog.getResults()
+
+            window = Window(parent=None)
+            window.export_options = initial_dialog.getExportOptions()
+            window.loadAafFile(selected_file_path, selected_options)
+            window.show()
+            windows.append(window)
+        else:
+            log.debug("Operation cancelled by user at startup.")
+            app.quit()
 
-        window = Window(parent=None)
-        window.loadAafFile(selected_file_path, selected_options)
-        window.show()
+    initial_dialog.finished.connect(onDialogFinished)
+    initial_dialog.open()
 
-        sys.exit(app.exec())
-    else:
-        print("Operation cancelled by user at startup.")
-        sys.exit(0)
\ No newline at end of file
+    exit_code = app.exec()
+    QtCore.QThreadPool.globalInstance().waitForDone()
+    sys.exit(exit_code)
\ No newline at end of file
@@ -0,0 +1,227 @@
+"""
+aaf_export.py
+
+The JSON writing behind AAFInspector's "Export to JSON...": the walk that
+streams a tree to text node by node, and the conversion of property values.
+Nothing here calls Qt or aaf2. The tree is reached through the accessors
+AAFInspector passes in, so the module can be compiled in place with Cython,
+which turns the walk and value conversion into C calls:
+
+    cythonize -i -3 aaf_export.py
+
+The resulting extension module is imported instead of this file whenever it
+is present next to it; deleting it falls back to the pure Python version.
+"""
+from __future__ import (
+    unicode_literals,
+    absolute_import,
+    print_function,
+    division,
+)
+
+import json
+import re
+import datetime
+import uuid
+
+# orjson, if installed, encodes the values in a JSON export much faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# True when running the Cython-compiled build of this module.
+try:
+    import cython
+    COMPILED = bool(cython.compiled)
+except ImportError:
+    COMPILED = False
+
+# The export is indented like json.dump(indent=4)
+INDENT = " " * 4
+
+# Names of the TimelineMobSlots left out of an export (A1-A8 and Data). Case-insensitive.
+EXCLUDED_SLOT_NAMES = frozenset(("a1", "a2", "a3", "a4", "a5", "a6", "a7", "a8", "data"))
+
+# Types written to JSON as they are; see serialize_json_value()
+_JSON_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+
+# Encoders for the JSON export, made once rather than by each json.dumps() call
+_encode_json = json.JSONEncoder(ensure_ascii=False).encode
+_encode_json_indented = json.JSONEncoder(ensure_ascii=False, indent=4).encode
+_LEADING_SPACES = re.compile(r"^ +", re.MULTILINE)
+
+
+def export_json(value):
+    """Returns value as JSON text indented like json.dumps(indent=4), using orjson when available."""
+    if orjson is not None:
+        try:
+            if type(value) is not list and type(value) is not dict or not value:
+                return orjson.dumps(value).decode()
+            text = orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+            # orjson only indents by two spaces. Strings have their newlines escaped,
+            # so all the spaces at the start of a line are indentation.
+            return _LEADING_SPACES.sub(lambda m: m.group() * 2, text)
+        except orjson.JSONEncodeError:
+            pass # Integers wider than 64 bits, for one
+    return _encode_json_indented(value)
+
+
+def json_head(name, class_name, value, depth):
+    """
+    Returns the opening of a node's JSON object at the given indent depth, up to the
+    end of its last field before "children". value is the node's JSON text, or None.
+    """
+    indent = "\n" + INDENT * (depth + 1)
+    parts = ["{", indent, '"name": ', _encode_json(name),
+             ",", indent, '"class": ', _encode_json(class_name)]
+    if value is not None:
+        # Nested lines of a dict or list value sit under this object's fields
+        parts += [",", indent, '"value": ', value.replace("\n", indent)]
+    return "".join(parts)
+
+
+def is_excluded(name, class_name, excluded_classes):
+    """Whether a node is left out of the export, along with everything below it."""
+    # Skip noisy TimelineMobSlots like A1–A8 and Data
+    # Using .lower() for case-insensitivity as a good practice
+    if class_name == "TimelineMobSlot" and name.lower() in EXCLUDED_SLOT_NAMES:
+        return True
+    return class_name in excluded_classes
+
+
+def stream_tree(root, f, node_head, child_at, child_count, progress=None, max_depth=0,
+                excluded_classes=frozenset()):
+    """
+    Writes root and its descendants to f as JSON, node by node, giving the same
+    text json.dump(indent=4) would for the nested dicts, without building them.
+
+    node_head(node, depth, progress, excluded_classes) returns the opening of a
+    node's object (see json_head()), or None to leave it out. child_at(node, row)
+    and child_count(node) give its children; they are only asked for after its head.
+    Objects max_depth levels down are written without their children, marked
+    "truncated" if they have any.
+    """
+    head = node_head(root, 0, progress, excluded_classes)
+    if head is None:
+        f.write("null")
+        return
+    f.write(head)
+    # One frame per open object: [node, next child row, child count, level, wrote "children"].
+    # Each level is two indents deeper than the one above: the object and its children list.
+    stack = [[root, 0, child_count(root), 0, False]]
+    while stack:
+        frame = stack[-1]
+        node, row, count, level, has_children = frame
+        if row < count:
+            frame[1] = row + 1
+            child = child_at(node, row)
+            if not child:
+                continue
+            head = node_head(child, 2 * level + 2, progress, excluded_classes)
+            if head is None:
+                continue
+            if has_children:
+                f.write(",\n")
+            else:
+                f.write(",\n" + INDENT * (2 * level + 1) + '"children": [\n')
+                frame[4] = True
+            f.write(INDENT * (2 * level + 2))
+            f.write(head)
+            if max_depth and level + 1 >= max_depth:
+                if child_count(child):
+                    f.write(",\n" + INDENT * (2 * level + 3) + '"truncated": true')
+                f.write("\n" + INDENT * (2 * level + 2) + "}")
+            else:
+                stack.append([child, 0, child_count(child), level + 1, False])
+        else:
+            stack.pop()
+            if has_children:
+                f.write("\n" + INDENT * (2 * level + 1) + "]")
+            f.write("\n" + INDENT * (2 * level) + "}")
+
+
+# --- Snapshot nodes ---
+# A snapshot keeps each node as a plain tuple: (name, class_name, value, full_value,
+# tooltip, export_value, children), the fields of AAFInspector's SnapshotNode.
+
+def snapshot_child(node, row):
+    return node[-1][row]
+
+def snapshot_child_count(node):
+    return len(node[-1])
+
+def snapshot_json_head(node, depth, progress=None, excluded_classes=frozenset()):
+    """The node_head() of stream_tree() for a snapshot node."""
+    if progress is not None:
+        progress.tick()
+    name, class_name, value = node[0], node[1], node[2]
+    name = name or class_name # As TreeItem.name() falls back to the class name
+    if is_excluded(name, class_name, excluded_classes):
+        return None
+    if value is not None:
+        value = export_json(serialize_json_value(node[5])) # The export value
+    return json_head(name, class_name, value, depth)
+
+
+# --- Value conversion ---
+
+def serialize_json_value(value):
+    """Converts a Python value from the AAF model into a JSON-serializable format."""
+    # One dict lookup on the exact type instead of an isinstance() chain per value
+    value_type = type(value)
+    handler = _JSON_HANDLERS.get(value_type)
+    if handler is None:
+        handler = _JSON_HANDLERS[value_type] = _resolve_json_handler(value)
+    return handler(value)
+
+# _JSON_HANDLERS maps the exact type of a value to its handler, like
+# TreeItem._SETUP_HANDLERS. Other types are resolved once with isinstance and added.
+
+def _resolve_json_handler(value):
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return _json_as_is
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return _json_isoformat
+    if isinstance(value, uuid.UUID):
+        return str
+    if isinstance(value, bytes):
+        return repr  # e.g., b'\\x01\\x02'
+    if isinstance(value, dict):
+        return _json_dict
+    if isinstance(value, (list, tuple)):
+        return _json_list
+    # For any other unhandled type (like other AAF objects), fall back to its string representation
+    return str
+
+def _json_as_is(value):
+    return value
+
+def _json_isoformat(value):
+    return value.isoformat()
+
+def _json_dict(value):
+    return {str(k): serialize_json_value(v) for k, v in value.items()}
+
+def _json_list(value):
+    # Arrays of plain numbers or strings need no conversion; the element
+    # types are checked in one pass at C speed instead of one call each
+    if _JSON_SCALAR_TYPES.issuperset(map(type, value)):
+        return list(value)
+    return [serialize_json_value(v) for v in value]
+
+_JSON_HANDLERS = {
+    str: _json_as_is,
+    int: _json_as_is,
+    float: _json_as_is,
+    bool: _json_as_is,
+    type(None): _json_as_is,
+    datetime.datetime: _json_isoformat,
+    datetime.date: _json_isoformat,
+    datetime.time: _json_isoformat,
+    uuid.UUID: str,
+    bytes: repr,
+    dict: _json_dict,
+    list: _json_list,
+    tuple: _json_list,
+}
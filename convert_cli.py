@@ -0,0 +1,485 @@
+"""
+convert_cli.py
+
+Headless AAF to JSON converter used by AAFInspector-Extended-Batch.py. It
+doesn't import PySide6, so it can also be run under PyPy, whose tracing JIT
+is much faster than CPython at the pure-Python tree walk:
+
+    pypy3 convert_cli.py <file.aaf> <output_dir> [<aaf2_lib_dir>] [--format json|msgpack|bson] [--gzip] [--pretty]
+
+The same node tree can be written as MessagePack or BSON instead of JSON for
+programmatic consumers; those formats are smaller and keep bytes as binary.
+Any of them can be gzip-compressed on the way to disk with --gzip. JSON is
+written compact unless --pretty asks for it to be indented for reading.
+
+Under CPython the module can also be compiled in place with Cython, which
+turns the tree walk and value conversion into C calls:
+
+    cythonize -i -3 convert_cli.py
+
+The resulting extension module is imported instead of this file whenever it
+is present next to it; deleting it falls back to the pure Python version.
+
+Progress and errors are reported as lines on stdout.
+"""
+from __future__ import (
+    unicode_literals,
+    absolute_import,
+    print_function,
+    division,
+)
+
+import sys
+import os
+import json
+import io
+import gzip
+import datetime
+import uuid
+import traceback
+import importlib
+import argparse
+import functools
+
+# orjson is optional; it encodes JSON fragments in C and natively understands
+# datetimes and UUIDs. Without it, ujson or python-rapidjson are tried, and
+# the standard library is used when none of them is installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_fast_dumps = None
+if orjson is None:
+    try:
+        import ujson
+        _fast_dumps = functools.partial(ujson.dumps, ensure_ascii=False, escape_forward_slashes=False)
+    except ImportError:
+        try:
+            import rapidjson
+            _fast_dumps = functools.partial(rapidjson.dumps, ensure_ascii=False)
+        except ImportError:
+            pass
+
+# Optional encoders for the binary output formats.
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    from bson import encode as bson_encode # Provided by pymongo
+    from bson.codec_options import CodecOptions, TypeRegistry
+except ImportError:
+    bson_encode = None
+
+# True when running the Cython-compiled build of this module.
+try:
+    import cython
+    COMPILED = bool(cython.compiled)
+except ImportError:
+    COMPILED = False
+
+# Tracks to be excluded from the JSON export. Case-insensitive.
+EXCLUDED_TRACK_NAMES = frozenset({f'a{i}' for i in range(1, 9)} | {'data track'})
+
+# Output formats and the extension of the files they produce.
+OUTPUT_FORMATS = {
+    'json': '.json',
+    'msgpack': '.msgpack',
+    'bson': '.bson',
+}
+
+# Value types that can be handed to the encoder without conversion.
+if orjson is not None:
+    _NATIVE_JSON_TYPES = (str, int, float, bool, type(None),
+                          datetime.datetime, datetime.date, datetime.time, uuid.UUID)
+else:
+    _NATIVE_JSON_TYPES = (str, int, float, bool, type(None))
+
+# Converters for values of these exact types, so that most leaves need a
+# single dict lookup instead of the isinstance chain in _serialize_json_value.
+_JSON_VALUE_CONVERTERS = {
+    datetime.datetime: datetime.datetime.isoformat,
+    datetime.date: datetime.date.isoformat,
+    datetime.time: datetime.time.isoformat,
+    uuid.UUID: str,
+    bytes: repr,
+}
+_JSON_VALUE_CONVERTERS.update(dict.fromkeys(_NATIVE_JSON_TYPES, lambda value: value))
+
+
+def _dumps(value):
+    """Encodes a single JSON fragment as UTF-8 bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except orjson.JSONEncodeError:
+            pass # e.g. integers wider than 64 bits; let the stdlib handle them
+    elif _fast_dumps is not None:
+        try:
+            return _fast_dumps(value).encode('utf-8')
+        except (OverflowError, ValueError, TypeError):
+            pass # Same as above, and NaN/Infinity
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# Types orjson encodes exactly as json.dumps(ensure_ascii=False) does. Floats
+# are not among them: orjson writes 1e20 where json writes 1e+20.
+_SAME_AS_JSON_TYPES = frozenset((str, int, bool, type(None)))
+
+
+def _json_default(value):
+    """Converts the values only orjson encodes natively for json.dumps."""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps_pretty(value):
+    """
+    Encodes a JSON fragment as UTF-8 bytes exactly as json.dumps(indent=4,
+    ensure_ascii=False) does, nested lines unpadded; see _write_node.
+    """
+    if orjson is not None and type(value) in _SAME_AS_JSON_TYPES:
+        try:
+            return orjson.dumps(value)
+        except orjson.JSONEncodeError:
+            pass # Integers wider than 64 bits
+    return json.dumps(value, indent=4, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+
+# Newline, indent step and key separator of the two JSON layouts, keyed by
+# whether pretty-printing was requested.
+_JSON_LAYOUTS = {
+    True: (b'\n', b'    ', b': '),
+    False: (b'', b'', b':'),
+}
+
+
+# Marks a Node that has no "value" entry.
+_NO_VALUE = object()
+
+# What getattr() gives for a reference child without a name attribute.
+_NO_NAME = object()
+
+
+class Node(object):
+    """
+    One node of the tree built for the binary formats. Slotted objects are
+    much smaller than the equivalent dicts; each one is turned into its
+    name/class/children or name/class/value dict only as it is encoded.
+    """
+    __slots__ = ('name', 'cls', 'children', 'value')
+
+    def __init__(self, name, cls):
+        self.name = name
+        self.cls = cls
+        self.children = None
+        self.value = _NO_VALUE
+
+    def as_dict(self):
+        fields = {"name": self.name, "class": self.cls}
+        if self.children:
+            fields["children"] = self.children
+        elif self.value is not _NO_VALUE:
+            fields["value"] = self.value
+        return fields
+
+
+def _open_output(path, compress):
+    """Opens an output file for writing bytes, gzip-compressed if requested."""
+    if compress:
+        # Level 1 compresses close to disk speed; the buffer gathers the many
+        # small fragment writes into large chunks before they reach zlib.
+        out_file = io.BufferedWriter(gzip.open(path, 'wb', compresslevel=1), 1 << 20)
+    else:
+        out_file = open(path, 'wb', buffering=1 << 20)
+    if hasattr(os, 'posix_fadvise'): # Linux/Unix only
+        os.posix_fadvise(out_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return out_file
+
+
+def _encode_binary(root, output_format):
+    """Encodes a whole Node tree as MessagePack or BSON bytes."""
+    if output_format == 'msgpack':
+        if msgpack is None:
+            raise ImportError("MessagePack output requires the 'msgpack' package")
+        return msgpack.packb(root, default=Node.as_dict, use_bin_type=True)
+    if bson_encode is None:
+        raise ImportError("BSON output requires the 'pymongo' package")
+    options = CodecOptions(type_registry=TypeRegistry(fallback_encoder=Node.as_dict))
+    return bson_encode(root.as_dict(), codec_options=options)
+
+
+class AafJsonConverter(object):
+    """
+    Converts AAF files to JSON. Holds no Qt state so that it can run inside
+    the worker processes of the batch pool.
+    """
+    def __init__(self, aaf2_module, mob_module):
+        self.aaf2 = aaf2_module
+        self.mob = mob_module
+        # Bind the classes used for dispatch once, rather than walking the
+        # module attributes for every node of the tree.
+        self._AAFObject = aaf2_module.core.AAFObject
+        self._StrongRefMulti = (aaf2_module.properties.StrongRefVectorProperty,
+                                aaf2_module.properties.StrongRefSetProperty)
+        self._StrongRef = aaf2_module.properties.StrongRefProperty
+        self._Property = aaf2_module.properties.Property
+        self._CompositionMob = mob_module.CompositionMob
+        # Maps the exact class of a node to the method listing its children.
+        # Other classes are resolved on first sight and added to the table.
+        self._handlers = {
+            self._CompositionMob: self._comp_mob_children,
+            aaf2_module.properties.StrongRefVectorProperty: self._multi_ref_children,
+            aaf2_module.properties.StrongRefSetProperty: self._multi_ref_children,
+            self._StrongRef: self._ref_children,
+            self._Property: self._no_children,
+        }
+
+    def convert(self, aaf_path, output_dir, output_format='json', compress=False, pretty=False):
+        """Opens, converts, and saves a single AAF file. Returns a log message."""
+        base_name = os.path.splitext(os.path.basename(aaf_path))[0]
+        out_path = os.path.join(output_dir, base_name + OUTPUT_FORMATS[output_format])
+        if compress:
+            out_path += ".gz"
+
+        opened_output = False # Only a file this call opened is removed on failure
+        try:
+            with self.aaf2.open(aaf_path, 'r') as f:
+                with _open_output(out_path, compress) as out_file:
+                    opened_output = True
+                    if output_format == 'json':
+                        # The JSON is streamed straight to disk while the AAF is walked, so
+                        # the full node tree never has to be held in memory.
+                        nl, indent, sep = _JSON_LAYOUTS[pretty]
+                        out_file.write(b'{' + nl + indent + b'"name"' + sep + b'"Root",'
+                                       + nl + indent + b'"class"' + sep + b'"Root",'
+                                       + nl + indent + b'"children"' + sep + b'[' + nl + indent * 2)
+                        self._write_node(out_file, f.header, "Header", 2, pretty)
+                        out_file.write(nl + indent + b']' + nl + b'}')
+                    else:
+                        root = Node("Root", "Root")
+                        root.children = [self._build_node(f.header, "Header")]
+                        out_file.write(_encode_binary(root, output_format))
+            return f"  -> Successfully saved to {os.path.basename(out_path)}"
+        except Exception as e:
+            # Don't leave a truncated output file behind, but never remove one
+            # from an earlier run when the AAF couldn't even be opened.
+            if opened_output and os.path.exists(out_path):
+                try: os.remove(out_path)
+                except OSError: pass
+            return f"  -> ERROR converting {os.path.basename(aaf_path)}: {e}\n{traceback.format_exc()}"
+
+    def _child_nodes(self, item):
+        """
+        Returns the (child, name) pairs to be written beneath `item`, or None
+        if `item` is a leaf that carries a value instead.
+        """
+        cls = type(item)
+        handler = self._handlers.get(cls)
+        if handler is None:
+            handler = self._handlers[cls] = self._resolve_handler(item)
+        return handler(item)
+
+    def _resolve_handler(self, item):
+        """Picks the children handler for a class that isn't in the table yet."""
+        if isinstance(item, self._CompositionMob):
+            return self._comp_mob_children
+        if isinstance(item, self._AAFObject):
+            return self._object_children
+        if isinstance(item, self._StrongRefMulti):
+            return self._multi_ref_children
+        if isinstance(item, self._StrongRef):
+            return self._ref_children
+        return self._no_children
+
+    # properties() is a generator over property_entries; the dict view is
+    # iterated directly to skip the generator frame for every object.
+    def _object_children(self, item):
+        return [(prop, prop.name) for prop in item.property_entries.values()]
+
+    def _comp_mob_children(self, item):
+        # A CompositionMob's slots are listed directly beneath it, minus the
+        # excluded tracks, instead of under a "Slots" property node.
+        children = []
+        for prop in item.property_entries.values():
+            prop_name = prop.name
+            if prop_name == "Slots":
+                named_slots = [(slot, getattr(slot, 'name', None)) for slot in prop.value]
+                children.extend([(slot, slot_name) for slot, slot_name in named_slots
+                                 if not (slot_name and slot_name.lower() in EXCLUDED_TRACK_NAMES)])
+            else:
+                children.append((prop, prop_name))
+        return children
+
+    def _multi_ref_children(self, item):
+        children = []
+        if item.value:
+            for child_item in item.value:
+                # A name that is None or "" is still written as it is
+                child_name = getattr(child_item, 'name', _NO_NAME)
+                if child_name is _NO_NAME:
+                    child_name = child_item.__class__.__name__
+                children.append((child_item, child_name))
+        return children
+
+    def _ref_children(self, item):
+        child_item = item.value
+        if child_item:
+            child_name = getattr(child_item, 'name', _NO_NAME)
+            if child_name is _NO_NAME:
+                child_name = child_item.__class__.__name__
+            return [(child_item, child_name)]
+        return []
+
+    def _no_children(self, item):
+        return None
+
+    def _write_node(self, out, item, name, depth, pretty=False):
+        """
+        Writes a node matching the name/class/children or name/class/value
+        schema, and all of its descendants, directly to `out`. Nodes are
+        indented by `depth` levels when `pretty` is set.
+
+        The tree is walked with an explicit stack of open "children" lists
+        instead of recursion, so deep AAFs don't pay for a Python frame per
+        node or run into the recursion limit.
+        """
+        write = out.write
+        nl, indent, sep = _JSON_LAYOUTS[pretty]
+        # Pretty output matches json.dump(indent=4), nested dict values included
+        dumps = _dumps_pretty if pretty else _dumps
+        stack = [] # (remaining children iterator, depth of the owning node)
+        while True:
+            pad = nl + indent * (depth + 1)
+            write(b'{' + pad + b'"name"' + sep + dumps(name)
+                  + b',' + pad + b'"class"' + sep + dumps(item.__class__.__name__))
+
+            children = self._child_nodes(item)
+            if children:
+                # Descend into the first child; the rest are picked up below.
+                write(b',' + pad + b'"children"' + sep + b'[' + pad + indent)
+                remaining = iter(children)
+                item, name = next(remaining)
+                stack.append((remaining, depth))
+                depth += 2
+                continue
+
+            if children is None:
+                value = item.value if isinstance(item, self._Property) else item
+                encoded = dumps(self._serialize_json_value(value))
+                if pretty:
+                    # The lines of a nested value sit under this node's fields
+                    encoded = encoded.replace(b'\n', pad)
+                write(b',' + pad + b'"value"' + sep + encoded)
+            write(nl + indent * depth + b'}')
+
+            # Move on to the next sibling, closing every finished parent.
+            while stack:
+                remaining, parent_depth = stack[-1]
+                sibling = next(remaining, None)
+                if sibling is not None:
+                    item, name = sibling
+                    depth = parent_depth + 2
+                    write(b',' + nl + indent * depth)
+                    break
+                stack.pop()
+                write(nl + indent * (parent_depth + 1) + b']' + nl + indent * parent_depth + b'}')
+            else:
+                return
+
+    def _build_node(self, item, name):
+        """
+        Builds the same structure that _write_node writes, as a tree of Node
+        records, for the formats that are encoded whole.
+        """
+        root = Node(name, item.__class__.__name__)
+        stack = [(item, root)]
+        while stack:
+            item, node = stack.pop()
+            children = self._child_nodes(item)
+            if children:
+                node.children = [Node(child_name, child.__class__.__name__)
+                                 for child, child_name in children]
+                stack.extend(zip((child for child, _ in children), node.children))
+            elif children is None:
+                value = item.value if isinstance(item, self._Property) else item
+                node.value = self._serialize_binary_value(value)
+        return root
+
+    def _serialize_binary_value(self, value):
+        """Like _serialize_json_value, but keeps bytes as native binary data."""
+        if isinstance(value, bytes):
+            return value
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        if isinstance(value, int) and not -(1 << 63) <= value < (1 << 63):
+            return str(value) # Both formats are limited to 64-bit integers
+        if isinstance(value, dict):
+            return {str(k): self._serialize_binary_value(v) for k, v in value.items()}
+        return self._serialize_json_value(value)
+
+    def _serialize_json_value(self, value):
+        """Converts a Python value into a JSON-serializable format."""
+        convert = _JSON_VALUE_CONVERTERS.get(type(value))
+        if convert is not None:
+            return convert(value)
+        # Subclasses of the types above, containers and everything else.
+        if isinstance(value, _NATIVE_JSON_TYPES):
+            return value
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        if isinstance(value, bytes):
+            return repr(value)
+        if isinstance(value, dict):
+            return {str(k): self._serialize_json_value(v) for k, v in value.items()}
+        return str(value)
+
+
+# Converter instance of the current process, created on first use.
+_process_converter = None
+
+def convert_file(aaf_path, output_dir, lib_path=None, output_format='json', compress=False,
+                 pretty=False):
+    """
+    Converts one AAF file and returns a log message. Modules can't be
+    pickled, so each process imports aaf2 itself from `lib_path` (the folder
+    the user located) on first use.
+    """
+    global _process_converter
+    if _process_converter is None:
+        if lib_path and lib_path not in sys.path:
+            sys.path.insert(0, lib_path)
+        _process_converter = AafJsonConverter(importlib.import_module("aaf2"),
+                                              importlib.import_module("aaf2.mob"))
+    return _process_converter.convert(aaf_path, output_dir, output_format, compress, pretty)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert an AAF file to JSON, MessagePack or BSON")
+    parser.add_argument("aaf_path", help="Input AAF file")
+    parser.add_argument("output_dir", help="Directory to write the JSON file to")
+    parser.add_argument("lib_path", nargs="?", help="Folder containing the 'aaf2' library")
+    parser.add_argument("--format", dest="output_format", choices=sorted(OUTPUT_FORMATS),
+                        default="json", help="Output format (default: json)")
+    parser.add_argument("--gzip", dest="compress", action="store_true",
+                        help="Gzip the output file (adds .gz to its name)")
+    parser.add_argument("--pretty", action="store_true",
+                        help="Indent JSON output for reading (default: compact)")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    message = convert_file(args.aaf_path, args.output_dir, args.lib_path,
+                           args.output_format, args.compress, args.pretty)
+    print(message, flush=True)
+    return 1 if message.startswith("  -> ERROR") else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,78 @@
 import json
+import re
 import sys
 
+# ijson, if installed, lets main() read the mobs one at a time instead of loading the whole file
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Path confirmed by the final diagnostic log
+PATH_TO_MOBS = ['Header', 'Header', 'Content', 'ContentStorage', 'Mobs']
+
+# A good timeline with this many events from a top-level CompositionMob (a sequence)
+# is taken as it is, without reading the mobs after it
+EARLY_EXIT_EVENTS = 50
+
+# Branches find_components_recursively() doesn't search, as they hold no Components
+NO_COMPONENTS = frozenset(('Dictionary', 'MetaDictionary'))
+
+# Kinds of slot parse_composition_mob() passes over without searching, as they hold no picture edit
+# DataDefinition AUIDs of slots with no picture timeline. The names in the
+# export vary ("Sound", "DataDef_Sound", "Descriptive Metadata"), the AUIDs don't.
+SKIPPED_DATA_DEFINITIONS = frozenset((
+    '01030202-0200-0000-060e-2b3404010101',  # Sound
+    '78e1ebe1-6cef-11d2-807d-006008143e6f',  # LegacySound
+    '01030201-1000-0000-060e-2b3404010101',  # Descriptive Metadata
+))
+
+# The AUID in an exported DataDefinition, e.g. "<aaf2.dictionary.DataDef Sound 01030202-0200-... at 0x...>"
+_DATA_DEF_AUID = re.compile(r'\bDataDef .*?\b([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})\b')
+
+class MobsNotFound(Exception):
+    """Raised when the JSON has no node at PATH_TO_MOBS."""
+
+def _child_index(node):
+    """Returns node's children by name (the first of each name), built once per node."""
+    index = node.get('_cidx')
+    if index is None:
+        index = {}
+        for child in node['children']:
+            if isinstance(child, dict):
+                index.setdefault(child.get('name'), child)
+        node['_cidx'] = index
+    return index
+
 def get_child_property(node, child_name, property_name='value'):
-    """Helper function to find a direct child's value by its name."""
+    """Helper function to find a direct child's value by its name, or the child itself if property_name is None."""
     if not isinstance(node, dict) or 'children' not in node:
         return None
-    for child in node['children']:
-        if isinstance(child, dict) and child.get('name') == child_name:
-            return child.get(property_name)
-    return None
+    child = _child_index(node).get(child_name)
+    if child is not None and property_name is not None:
+        return child.get(property_name)
+    return child
 
 def find_node_by_path(node, path):
     """Finds a nested node by following a list of names."""
     current = node
     for key in path:
-        if isinstance(current, dict) and 'children' in current:
-            found_child = None
-            for child in current['children']:
-                if isinstance(child, dict) and child.get('name') == key:
-                    found_child = child
-                    break
-            current = found_child
-            if current is None: return None
-        else:
+        if not isinstance(current, dict) or 'children' not in current:
+            return None
+        # Each node on the path is looked in once, so its children are searched up to
+        # the first of that name, as _child_index() would give, rather than indexed
+        current = next((child for child in current['children']
+                        if isinstance(child, dict) and child.get('name') == key), None)
+        if current is None:
             return None
     return current
 
 def parse_keyframes(varying_value_node):
     """Parses a VaryingValue node to extract keyframes."""
+    # Remembered on the node, like the result of find_components_recursively()
+    keyframes = varying_value_node.get('_keyframes')
+    if keyframes is not None:
+        return keyframes
     keyframes = []
     points_to_check = varying_value_node.get('children', [])
     
@@ -41,6 +86,7 @@ def parse_keyframes(varying_value_node):
             value = get_child_property(node, 'Value')
             if time is not None and value is not None:
                 keyframes.append({'time_offset': time, 'value': value})
+    varying_value_node['_keyframes'] = keyframes
     return keyframes
 
 def parse_effect(effect_node):
@@ -66,53 +112,84 @@ def parse_components(components_node):
     if not components_node or 'children' not in components_node:
         return timeline
 
+    # Bound once for the loop, which runs for every component of the sequence
+    append_event = timeline.append
+    child_property = get_child_property
+    event_number = 0
+    clip_effects = None # The effects list of the last clip
+
     for component in components_node['children']:
         if not isinstance(component, dict): continue
+        component_class = component.get('class')
 
-        if component.get('class') == 'SourceClip':
-            duration = int(get_child_property(component, 'Length', 'value') or 0)
-            source_in_tc = get_child_property(component, 'StartTime', 'value')
+        if component_class == 'SourceClip':
+            duration = int(child_property(component, 'Length', 'value') or 0)
+            source_in_tc = child_property(component, 'StartTime', 'value')
 
             clip_name = 'Unknown Clip'
-            source_mob_ref_node = get_child_property(component, 'Source Mob Ref', property_name=None)
+            source_mob_ref_node = child_property(component, 'Source Mob Ref', property_name=None)
             if source_mob_ref_node and 'children' in source_mob_ref_node and source_mob_ref_node['children']:
                 actual_mob_node = source_mob_ref_node['children'][0]
                 clip_name = actual_mob_node.get('name', clip_name)
 
-            clip_event = {
-                "event_number": len(timeline) + 1, "type": "Clip", "name": clip_name,
+            event_number += 1
+            clip_effects = []
+            append_event({
+                "event_number": event_number, "type": "Clip", "name": clip_name,
                 "start_time_frames": current_time_frames, "duration_frames": duration,
-                "source_in_tc": source_in_tc, "effects": []
-            }
-            timeline.append(clip_event)
+                "source_in_tc": source_in_tc, "effects": clip_effects
+            })
             current_time_frames += duration
 
-        elif component.get('class') == 'OperationGroup':
-            if not timeline: continue
+        elif component_class == 'OperationGroup':
+            if clip_effects is None: continue
             effect = parse_effect(component)
-            if 'animated_params' in effect and effect['animated_params']:
-                timeline[-1]['effects'].append(effect)
+            if effect['animated_params']:
+                clip_effects.append(effect)
     return timeline
 
 def find_components_recursively(node):
-    """Recursive helper to find the 'Components' node within any structure."""
-    if isinstance(node, dict) and node.get('name') == 'Components' and 'children' in node:
-        return node
-    
-    if isinstance(node, dict) and 'children' in node:
-        for child in node['children']:
-            result = find_components_recursively(child)
-            if result:
-                return result
-    return None
+    """Finds the first 'Components' node within any structure, searching depth-first."""
+    if not isinstance(node, dict):
+        return None
+    # Remembered on the node, so a subtree searched before isn't walked again
+    if '_comp_cache' in node:
+        return node['_comp_cache']
+    result = None
+    # An explicit stack instead of recursion, so deep trees can't hit the recursion limit.
+    # Children are pushed last first, so they are visited in their order.
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.get('name') == 'Components' and 'children' in current:
+            result = current
+            break
+        if current.get('name') in NO_COMPONENTS:
+            continue
+        children = current.get('children')
+        if children:
+            stack.extend(child for child in reversed(children) if isinstance(child, dict))
+    node['_comp_cache'] = result
+    return result
+
+def slot_data_definition(slot):
+    """Returns the AUID of the DataDefinition of a slot's Segment, or None."""
+    segment = get_child_property(slot, 'Segment', property_name=None)
+    if not segment or not segment.get('children'):
+        return None
+    data_def = get_child_property(segment['children'][0], 'DataDefinition')
+    match = _DATA_DEF_AUID.search(data_def) if isinstance(data_def, str) else None
+    return match.group(1) if match else None
 
 def parse_composition_mob(comp_mob_node):
-    """Parses a single CompositionMob by iterating through ALL its slots."""
+    """Parses a single CompositionMob by iterating through its slots, up to the first with a timeline."""
     slots_node = get_child_property(comp_mob_node, 'Slots', property_name=None)
     if not slots_node or 'children' not in slots_node:
         return None
 
     for slot in slots_node['children']:
+        if slot_data_definition(slot) in SKIPPED_DATA_DEFINITIONS:
+            continue
         components_node = find_components_recursively(slot)
         if components_node:
             timeline = parse_components(components_node)
@@ -121,45 +198,104 @@ def parse_composition_mob(comp_mob_node):
     
     return None
 
+def stream_children(f, path, wanted_class):
+    """
+    Yields the children of class wanted_class of the node found by following path
+    (a list of names) from the root, reading the binary file f with ijson, so only one
+    of them is in memory at a time; the others are skipped without being built.
+    Relies on each node's "name" coming before its "children", as AAFInspector writes them.
+    """
+    # A node n levels down has the prefix 'children.item' n times over
+    prefixes = ['.'.join(['children.item'] * level) for level in range(1, len(path) + 1)]
+    name_levels = {prefix + '.name': level for level, prefix in enumerate(prefixes)}
+    children_prefix = prefixes[-1] + '.children'
+    class_prefix = children_prefix + '.item.class'
+    names = [None] * len(path) # Names of the nodes on the way down to the current one
+
+    events = ijson.parse(f, use_float=True)
+    for prefix, event, value in events:
+        level = name_levels.get(prefix)
+        if level is not None:
+            names[level:] = [value] + [None] * (len(path) - level - 1)
+        elif event == 'start_array' and prefix == children_prefix and names == path:
+            break
+    else:
+        raise MobsNotFound()
+
+    builder = None
+    skipping = False
+    depth = 0 # Of the child being read, which ends back at 0
+    for prefix, event, value in events:
+        if depth == 0:
+            if event == 'end_array':
+                return # The end of the children
+            skipping = event != 'start_map'
+            builder = None if skipping else ijson.ObjectBuilder()
+        if event == 'start_map' or event == 'start_array':
+            depth += 1
+        elif event == 'end_map' or event == 'end_array':
+            depth -= 1
+        if skipping:
+            continue
+        builder.event(event, value)
+        if depth == 0:
+            yield builder.value
+        elif depth == 1 and prefix == class_prefix and value != wanted_class:
+            skipping = True
+
+def iter_composition_mobs(f):
+    """Yields the CompositionMobs of the JSON in the binary file f, streamed when ijson is installed."""
+    if ijson is not None:
+        mobs = stream_children(f, PATH_TO_MOBS, 'CompositionMob')
+    else:
+        mobs_node = find_node_by_path(json.load(f), PATH_TO_MOBS)
+        if not mobs_node or 'children' not in mobs_node:
+            raise MobsNotFound()
+        mobs = mobs_node['children']
+    for mob in mobs:
+        if isinstance(mob, dict) and mob.get('class') == 'CompositionMob':
+            yield mob
+
+def is_top_level(comp_mob):
+    """Whether a CompositionMob is a top-level one (UsageCode 'Usage_TopLevel'), i.e. a sequence."""
+    usage_code = get_child_property(comp_mob, 'UsageCode')
+    return isinstance(usage_code, str) and usage_code.endswith('TopLevel')
+
 def main(json_path):
     """Main function to load JSON and initiate parsing."""
+    json_errors = (json.JSONDecodeError, ijson.JSONError) if ijson is not None else json.JSONDecodeError
+    best_timeline = None
+    found_comp_mob = False
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(json_path, 'rb') as f:
+            # Each mob is parsed as it is read
+            for comp_mob in iter_composition_mobs(f):
+                found_comp_mob = True
+                parsed_timeline = parse_composition_mob(comp_mob)
+
+                if parsed_timeline:
+                    is_good_parse = len(parsed_timeline) > 1 or \
+                                   (len(parsed_timeline) == 1 and parsed_timeline[0].get('name') != 'Unknown Clip')
+
+                    if is_good_parse:
+                        if best_timeline is None or len(parsed_timeline) > len(best_timeline):
+                            best_timeline = parsed_timeline
+                        if len(parsed_timeline) >= EARLY_EXIT_EVENTS and is_top_level(comp_mob):
+                            break # A full sequence; no need to read the rest
     except FileNotFoundError:
         print(f"Error: The file '{json_path}' was not found.")
         return
-    except json.JSONDecodeError:
+    except json_errors:
         print(f"Error: The file '{json_path}' is not a valid JSON file.")
         return
-    
-    # Path confirmed by the final diagnostic log
-    path_to_mobs = ['Header', 'Header', 'Content', 'ContentStorage', 'Mobs']
-    
-    mobs_node = find_node_by_path(data, path_to_mobs)
-    if not mobs_node or 'children' not in mobs_node:
+    except MobsNotFound:
         print("Error: Could not find the 'Mobs' list at the expected path.")
         return
-        
-    all_mobs = mobs_node['children']
-    all_comp_mobs = [mob for mob in all_mobs if isinstance(mob, dict) and mob.get('class') == 'CompositionMob']
 
-    if not all_comp_mobs:
+    if not found_comp_mob:
         print("Error: Could not find any 'CompositionMob' in the Mobs list.")
         return
 
-    best_timeline = None
-    for comp_mob in all_comp_mobs:
-        parsed_timeline = parse_composition_mob(comp_mob)
-        
-        if parsed_timeline:
-            is_good_parse = len(parsed_timeline) > 1 or \
-                           (len(parsed_timeline) == 1 and parsed_timeline[0].get('name') != 'Unknown Clip')
-                           
-            if is_good_parse:
-                if best_timeline is None or len(parsed_timeline) > len(best_timeline):
-                    best_timeline = parsed_timeline
-                
     if best_timeline:
         print(json.dumps(best_timeline, indent=4))
     else: